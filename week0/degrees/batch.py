@@ -0,0 +1,202 @@
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from collections import deque
+
+import degrees
+
+
+class SourceTree():
+    """
+    Breadth-first tree rooted at one person, grown only as far as the
+    queries against it need. Later targets resume where earlier ones
+    stopped instead of searching from scratch.
+    """
+
+    def __init__(self, source, neighbors):
+        self.neighbors = neighbors
+        # Maps person to (movie, parent person) one step closer to the source
+        self.parents = {source: None}
+        # People discovered but not yet expanded, in breadth-first order
+        self.frontier = deque([source])
+
+    def path_to(self, target):
+        """
+        Returns the shortest list of (movie, person) pairs from the
+        source to target, or None if they are not connected.
+        """
+        parents = self.parents
+        frontier = self.frontier
+        neighbors = self.neighbors
+        while target not in parents and frontier:
+            person = frontier.popleft()
+            for movie, neighbor in neighbors(person):
+                if neighbor not in parents:
+                    parents[neighbor] = (movie, person)
+                    frontier.append(neighbor)
+
+        if target not in parents:
+            return None
+        path = []
+        while parents[target] is not None:
+            movie, parent = parents[target]
+            path.append((movie, target))
+            target = parent
+        path.reverse()
+        return path
+
+
+def read_pairs(f):
+    """
+    Yields (line number, source name, target name) for every
+    tab-separated pair of names. Blank lines and # comments are skipped.
+    """
+    for number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = [field.strip() for field in line.split("\t")]
+        if len(fields) != 2:
+            yield number, line, None
+        else:
+            yield number, fields[0], fields[1]
+
+
+def resolve(name, policy="none", fuzzy=False):
+    """
+    Returns (person_id, error) for a name without asking the user.
+    """
+    person_ids = degrees.candidates_for_name(name, fuzzy)
+    if len(person_ids) == 0:
+        return None, f"person not found: {name}"
+    if len(person_ids) > 1:
+        person_id = degrees.choose_person(name, person_ids, policy)
+        if person_id is None:
+            return None, f"ambiguous name: {name} ({', '.join(person_ids)})"
+        return person_id, None
+    return person_ids[0], None
+
+
+def answer_group(group):
+    """
+    Answers every (line, target) query for one source, returning
+    (line, path, seconds) for each.
+    """
+    source, queries = group
+    if len(queries) == 1:
+        # Nothing to share, so the bidirectional search is cheaper
+        line, target = queries[0]
+        start = time.perf_counter()
+        path = degrees.shortest_path(source, target)
+        return [(line, path, time.perf_counter() - start)]
+
+    graph = degrees.graph
+    if graph is None:
+        tree = SourceTree(source, degrees.neighbors_for_person)
+    else:
+        tree = SourceTree(graph.person_index[source], graph.neighbors)
+
+    answers = []
+    for line, target in queries:
+        start = time.perf_counter()
+        if graph is None:
+            path = tree.path_to(target)
+        else:
+            path = graph.to_ids(tree.path_to(graph.person_index[target]))
+        answers.append((line, path, time.perf_counter() - start))
+    return answers
+
+
+def initialize(directory, compact, cache):
+    """
+    Loads the data in a worker that did not inherit it.
+    """
+    if not degrees.people:
+        degrees.load_data(directory, compact=compact, cache=cache)
+
+
+def run(pairs, output, jobs=1, initargs=None, policy="none", fuzzy=False):
+    """
+    Answers all (line, source name, target name) queries, writing one
+    JSON object per query to output in input order.
+    """
+    records = {}
+    groups = {}
+    for line, source_name, target_name in pairs:
+        record = {"line": line, "source": source_name, "target": target_name}
+        records[line] = record
+        if target_name is None:
+            record["error"] = "expected two tab-separated names"
+            continue
+        source, error = resolve(source_name, policy, fuzzy)
+        if source is not None:
+            target, error = resolve(target_name, policy, fuzzy)
+        if error is not None:
+            record["error"] = error
+            continue
+        groups.setdefault(source, []).append((line, target))
+
+    if jobs > 1 and len(groups) > 1:
+        with multiprocessing.Pool(jobs, initialize, initargs) as pool:
+            results = pool.imap_unordered(answer_group, groups.items())
+            answers = [answer for group in results for answer in group]
+    else:
+        answers = [answer for group in groups.items()
+                   for answer in answer_group(group)]
+
+    for line, path, seconds in answers:
+        record = records[line]
+        record["degrees"] = None if path is None else len(path)
+        record["path"] = path
+        record["seconds"] = round(seconds, 6)
+
+    for line in sorted(records):
+        output.write(json.dumps(records[line]) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees-of-separation queries at once."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("pairs", nargs="?", default="-",
+                        help="file of tab-separated name pairs (- for stdin)")
+    parser.add_argument("--output", default="-",
+                        help="JSON lines output file (- for stdout)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="worker processes to spread queries across")
+    parser.add_argument("--resolve", default="none",
+                        choices=[p for p in degrees.POLICIES if p != "ask"],
+                        help="how to choose between people with one name")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="fall back to the closest names on no match")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--cache", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    degrees.load_data(args.directory, compact=args.compact, cache=args.cache)
+    print(f"Data loaded in {time.perf_counter() - start:.2f}s.",
+          file=sys.stderr)
+
+    source = sys.stdin
+    output = sys.stdout
+    try:
+        if args.pairs != "-":
+            source = open(args.pairs, encoding="utf-8")
+        if args.output != "-":
+            output = open(args.output, "w", encoding="utf-8")
+        run(read_pairs(source), output, args.jobs,
+            (args.directory, args.compact, args.cache), args.resolve,
+            args.fuzzy)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
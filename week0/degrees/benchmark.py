@@ -0,0 +1,56 @@
+import argparse
+import random
+import time
+
+import degrees
+from util import SearchStats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("queries", nargs="?", type=int, default=100)
+    parser.add_argument("--compact", action="store_true")
+    args = parser.parse_args()
+    queries = args.queries
+
+    print("Loading data...")
+    start = time.perf_counter()
+    degrees.load_data(args.directory, compact=args.compact)
+    print(f"Data loaded in {time.perf_counter() - start:.2f}s.")
+
+    # Only people who starred in something can be connected to anyone
+    cast = [person_id for person_id in degrees.people
+            if degrees.movies_for_person(person_id)]
+    rng = random.Random(50)
+    pairs = [tuple(rng.sample(cast, 2)) for _ in range(queries)]
+
+    for label, bidirectional in [("bfs", False), ("bidirectional", True)]:
+        states, seconds, connected = run(pairs, bidirectional)
+        print(f"{label}: {queries} queries, {connected} connected, "
+              f"{states} states visited in {seconds:.2f}s "
+              f"({states / seconds:,.0f} states/s)")
+
+
+def run(pairs, bidirectional):
+    """
+    Times shortest_path over pairs, counting every person expanded.
+    """
+    states = 0
+
+    def record(stats):
+        nonlocal states
+        states += stats.nodes_expanded
+
+    connected = 0
+    start = time.perf_counter()
+    for source, target in pairs:
+        stats = SearchStats(record)
+        if degrees.shortest_path(source, target, bidirectional, stats):
+            connected += 1
+    seconds = time.perf_counter() - start
+    return states, seconds, connected
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,20 @@
+import argparse
 import csv
+import itertools
+import os
+import re
 import sys
+import time
+from collections import Counter
 
-from util import Node, StackFrontier, QueueFrontier
+import snapshot
+from distances import DistanceIndex, reverse_path
+from graph import CoStarGraph
+from name_index import NameIndex
+from records import Records
+from util import Node, StackFrontier, QueueFrontier, SearchStats
 
-# Maps names to a set of corresponding person_ids
+# Maps names to a set of corresponding person_ids (a tuple in compact mode)
 names = {}
 
 # Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
@@ -12,64 +23,270 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact co-star graph; when set, people and movies are Records holding
+# no movies/stars sets, indexed like the graph
+graph = None
 
-def load_data(directory):
+# Maps source person_ids to a DistanceIndex answering paths from that person
+distance_indexes = {}
+
+# Sorted index over names for prefix and fuzzy lookups, built on first use
+name_index = None
+
+# Most edits a fuzzy name lookup tolerates
+FUZZY_DISTANCE = 2
+
+# Ways of choosing between several people with the same name
+POLICIES = ["ask", "most-movies", "oldest", "youngest", "none"]
+
+
+# Rows read from each CSV file per chunk
+CHUNK_SIZE = 10000
+
+
+def load_data(directory, compact=False, cache=False):
     """
     Load data from CSV files into memory.
+
+    With compact=True the person/movie links are stored
+    in an integer-indexed CoStarGraph instead of sets,
+    and people and movies are kept column by column.
+    With cache=True the compact graph is saved to a binary
+    snapshot next to the CSV files and memory-mapped on
+    later runs, as long as the CSV files are unchanged.
+
+    Anything loaded before is replaced, along with the
+    distance indexes built from it.
+
+    Returns a Counter of rows loaded and rejected per file.
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+    global graph, name_index, names, people, movies
+    report = Counter()
+    graph = None
+    name_index = None
+    distance_indexes.clear()
+
+    if cache:
+        cached = snapshot.load(directory)
+        if cached is not None:
+            people, movies, names, graph = cached
+            report["people_loaded"] = len(people)
+            report["movies_loaded"] = len(movies)
+            report["stars_loaded"] = len(graph.person_movies)
+            return report
+        compact = True
+
+    names = {}
+    if compact:
+        people = Records.empty("name", "birth")
+        movies = Records.empty("title", "year")
+    else:
+        people = {}
+        movies = {}
+    for chunk in read_chunks(f"{directory}/people.csv"):
+        add_people(chunk, report, compact)
+    for chunk in read_chunks(f"{directory}/movies.csv"):
+        add_movies(chunk, report, compact)
+
+    if compact:
+        # Build the CSR arrays in one pass rather than through the overlay
+        rows = 0
+
+        def edges():
+            nonlocal rows
+            for chunk in read_chunks(f"{directory}/stars.csv"):
+                for row in chunk:
+                    rows += 1
+                    yield row.get("person_id"), row.get("movie_id")
+
+        graph = CoStarGraph.from_edges(people.ids, movies.ids, edges(),
+                                       people.index, movies.index)
+        report["stars_loaded"] = len(graph.person_movies)
+        report["stars_rejected"] = rows - len(graph.person_movies)
+    else:
+        for chunk in read_chunks(f"{directory}/stars.csv"):
+            add_stars(chunk, report)
+
+    if cache:
+        snapshot.save(directory, people, movies, names, graph)
+    return report
+
+
+def ingest(directory, chunk_size=CHUNK_SIZE):
+    """
+    Appends the rows of whichever of people.csv, movies.csv and stars.csv
+    exist in directory to the already loaded data, one chunk at a time.
+    Rows for IDs that are already loaded, and stars naming unknown people
+    or movies, are rejected.
+
+    Returns a Counter of rows loaded and rejected per file.
+    """
+    report = Counter()
+    compact = graph is not None
+    loaders = [
+        ("people.csv", lambda chunk: add_people(chunk, report, compact)),
+        ("movies.csv", lambda chunk: add_movies(chunk, report, compact)),
+        ("stars.csv", lambda chunk: add_stars(chunk, report))
+    ]
+    for filename, load in loaders:
+        path = f"{directory}/{filename}"
+        if os.path.exists(path):
+            for chunk in read_chunks(path, chunk_size):
+                load(chunk)
+
+    # Stored trees no longer cover newly connected people
+    distance_indexes.clear()
+    return report
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """
+    Yields lists of up to chunk_size rows from a CSV file.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
         reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
+        while True:
+            chunk = list(itertools.islice(reader, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def add_people(rows, report, compact):
+    """
+    Adds people rows that have an unseen id and a name.
+    """
+    global name_index
+    name_index = None
+    for row in rows:
+        person_id = row.get("id")
+        name = row.get("name")
+        if not person_id or name is None or person_id in people:
+            report["people_rejected"] += 1
+            continue
+        birth = row.get("birth") or ""
+        if compact:
+            # people shares its IDs and index with the graph, if any
+            people.append(person_id, name=name, birth=birth)
+            key = name.lower()
+            names[key] = names.get(key, ()) + (person_id,)
+        else:
+            people[person_id] = {
+                "name": name,
+                "birth": birth,
                 "movies": set()
             }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+            names.setdefault(name.lower(), set()).add(person_id)
+        report["people_loaded"] += 1
 
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
+
+def add_movies(rows, report, compact):
+    """
+    Adds movie rows that have an unseen id and a title.
+    """
+    for row in rows:
+        movie_id = row.get("id")
+        title = row.get("title")
+        if not movie_id or title is None or movie_id in movies:
+            report["movies_rejected"] += 1
+            continue
+        year = row.get("year") or ""
+        if compact:
+            movies.append(movie_id, title=title, year=year)
+        else:
+            movies[movie_id] = {
+                "title": title,
+                "year": year,
                 "stars": set()
             }
+        report["movies_loaded"] += 1
 
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+
+def add_stars(rows, report):
+    """
+    Links people to movies for star rows naming a known person and movie.
+    """
+    for row in rows:
+        person_id = row.get("person_id")
+        movie_id = row.get("movie_id")
+        if person_id not in people or movie_id not in movies:
+            report["stars_rejected"] += 1
+            continue
+        if graph is not None:
+            graph.add_star(person_id, movie_id)
+        else:
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+        report["stars_loaded"] += 1
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compact", action="store_true",
+                        help="store the co-star graph in integer arrays")
+    parser.add_argument("--cache", action="store_true",
+                        help="load from (and save) a binary snapshot")
+    parser.add_argument("--index", action="append", default=[],
+                        metavar="FILE",
+                        help="answer from a saved distance index")
+    parser.add_argument("--histogram", action="store_true",
+                        help="print everyone's distance from one person")
+    parser.add_argument("--save-index", metavar="FILE",
+                        help="with --histogram, save the distance index")
+    parser.add_argument("--resolve", choices=POLICIES, default="ask",
+                        help="how to choose between people with one name")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="fall back to the closest names on no match")
+    parser.add_argument("--stats", action="store_true",
+                        help="print search counters and per-level timings")
+    args = parser.parse_args()
+    directory = args.directory
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    report = load_data(directory, compact=args.compact, cache=args.cache)
     print("Data loaded.")
+    for filename in ["people", "movies", "stars"]:
+        if report[f"{filename}_rejected"]:
+            print(f"Skipped {report[filename + '_rejected']} rows "
+                  f"of {filename}.csv.")
+    key = data_key(directory)
+    person_ids, movie_ids, person_index, movie_index = numbering()
+    for path in args.index:
+        try:
+            index = DistanceIndex.load(path, person_ids, movie_ids,
+                                       person_index)
+        except ValueError as e:
+            sys.exit(f"{path}: {e}")
+        if index.key != key:
+            sys.exit(f"{path} was not built from the data in {directory}.")
+        distance_indexes[index.source] = index
 
-    source = person_id_for_name(input("Name: "))
+    if args.histogram:
+        source = person_id_for_name(input("Name: "), args.resolve, args.fuzzy)
+        if source is None:
+            sys.exit("Person not found.")
+        index = distance_index(source)
+        if args.save_index:
+            index.key = key
+            index.save(args.save_index)
+        histogram = index.histogram()
+        print(f"Degrees of separation from {people[source]['name']}:")
+        for distance in sorted(d for d in histogram if d is not None):
+            print(f"{distance}: {histogram[distance]}")
+        print(f"Not connected: {histogram.get(None, 0)}")
+        return
+
+    source = person_id_for_name(input("Name: "), args.resolve, args.fuzzy)
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = person_id_for_name(input("Name: "), args.resolve, args.fuzzy)
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    stats = SearchStats() if args.stats else None
+    path = shortest_path(source, target, stats=stats)
 
     if path is None:
         print("Not connected.")
@@ -82,61 +299,340 @@ def main():
             person2 = people[path[i + 1][1]]["name"]
             movie = movies[path[i + 1][0]]["title"]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+    if stats is not None:
+        print(stats)
+
+
+def data_key(directory):
+    """
+    Identifies the data loaded from directory, so that a saved
+    DistanceIndex is only used with the data it was built from.
+    """
+    return {
+        "sources": snapshot.source_key(directory),
+        "people": len(people),
+        "movies": len(movies)
+    }
+
+
+def shortest_path(source, target, bidirectional=True, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
+
+    If no possible path, returns None.
+
+    If stats is a SearchStats it is filled in with profiling counters.
+    """
+    start = time.perf_counter()
+    path = find_path(source, target, bidirectional, stats)
+    if stats is not None:
+        stats.finish(time.perf_counter() - start)
+    return path
+
+
+def find_path(source, target, bidirectional, stats):
+    """
+    Picks the cheapest way to answer a shortest_path query.
+    """
+    # A stored tree from either end answers in O(path length)
+    if source in distance_indexes:
+        return distance_indexes[source].path_to(target)
+    if target in distance_indexes:
+        return reverse_path(distance_indexes[target].path_to(source), target)
+
+    search = bidirectional_search if bidirectional else breadth_first_search
+    if graph is None:
+        return search(source, target, neighbors_for_person, stats)
+
+    # Search over interned indices and translate the answer back to IDs
+    if source not in graph.person_index or target not in graph.person_index:
+        return None
+    return graph.to_ids(search(graph.person_index[source],
+                               graph.person_index[target],
+                               graph.neighbors, stats))
+
 
+def breadth_first_search(source, target, neighbors, stats=None):
+    """
+    One-sided breadth-first search from source towards target.
+    """
+    if source == target:
+        return []
 
-def shortest_path(source, target):
-    frontier = QueueFrontier()
+    if stats is not None:
+        neighbors = stats.count_neighbors(neighbors)
+        stats.start_level()
+    frontier = QueueFrontier(stats)
     frontier.add(Node(source, None, None))
-    explored_set = []
+    # People already expanded or waiting in the frontier
+    seen = {source}
+    # People left to expand at the current depth
+    level_left = 1
     while not frontier.empty():
-        next_node = frontier.remove()
-        explored_set.append(next_node.state)
-        neighbors = neighbors_for_person(next_node.state)
-        for pair in neighbors:
-            if pair[1] == target:
-                solution = [(pair[0], pair[1])]
-                while next_node.parent:
-                    print("next node parent:", next_node.parent.state)
-                    solution.append((next_node.action, next_node.state))
-                    next_node = next_node.parent
+        node = frontier.remove()
+        for movie_id, person_id in neighbors(node.state):
+            if person_id in seen:
+                continue
+            child = Node(person_id, node, movie_id)
+            if person_id == target:
+                if stats is not None:
+                    stats.end_level()
+                solution = []
+                while child.parent is not None:
+                    solution.append((child.action, child.state))
+                    child = child.parent
                 solution.reverse()
                 return solution
-            if pair[1] not in explored_set:
-                frontier.add(Node(pair[1], next_node, pair[0]))
+            seen.add(person_id)
+            frontier.add(child)
+
+        level_left -= 1
+        if level_left == 0:
+            level_left = len(frontier.frontier)
+            if stats is not None:
+                stats.end_level()
+    return None
+
+
+def bidirectional_search(source, target, neighbors, stats=None):
+    """
+    Breadth-first search grown from both source and target, one whole
+    level at a time, always expanding the smaller frontier. The search
+    stops at the first level where the two sides meet.
+    """
+    if source == target:
+        return []
+
+    # Maps person_id to (movie_id, person_id) one step closer to that
+    # side's root
+    forward = {source: None}
+    backward = {target: None}
+    # Distance of every discovered person from that side's root
+    forward_depth = {source: 0}
+    backward_depth = {target: 0}
+    forward_frontier = [source]
+    backward_frontier = [target]
+    if stats is not None:
+        neighbors = stats.count_neighbors(neighbors)
+        stats.enqueued(2, 2)
+        stats.start_level()
+
+    while forward_frontier and backward_frontier:
+        # Expand the cheaper side; the co-star graph is undirected
+        if len(forward_frontier) <= len(backward_frontier):
+            parents, depth = forward, forward_depth
+            other_depth = backward_depth
+            frontier = forward_frontier
+        else:
+            parents, depth = backward, backward_depth
+            other_depth = forward_depth
+            frontier = backward_frontier
+
+        next_frontier = []
+        best = None
+        for person_id in frontier:
+            for movie_id, neighbor_id in neighbors(person_id):
+                if neighbor_id in parents:
+                    continue
+                parents[neighbor_id] = (movie_id, person_id)
+                depth[neighbor_id] = depth[person_id] + 1
+                next_frontier.append(neighbor_id)
+                if neighbor_id in other_depth:
+                    length = depth[neighbor_id] + other_depth[neighbor_id]
+                    if best is None or length < best[0]:
+                        best = (length, neighbor_id)
+
+        if frontier is forward_frontier:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+        if stats is not None:
+            stats.nodes_expanded += len(frontier)
+            stats.enqueued(len(next_frontier),
+                           len(forward_frontier) + len(backward_frontier))
+            stats.end_level()
+
+        if best is not None:
+            return join_paths(forward, backward, best[1])
     return None
 
 
-def person_id_for_name(name):
+def distance_index(source):
+    """
+    Runs one full breadth-first search from source, registers the
+    resulting DistanceIndex for later shortest_path calls and returns it.
+    """
+    person_ids, movie_ids, person_index, movie_index = numbering()
+    if graph is not None:
+        neighbors = graph.neighbors
+    else:
+        def neighbors(person):
+            person_id = person_ids[person]
+            for movie_id, star_id in neighbors_for_person(person_id):
+                yield movie_index[movie_id], person_index[star_id]
+
+    index = DistanceIndex.build(source, person_ids, movie_ids, person_index,
+                                neighbors)
+    distance_indexes[source] = index
+    return index
+
+
+def numbering():
+    """
+    Returns (person_ids, movie_ids, person_index, movie_index) numbering
+    the loaded people and movies in load order: the graph's own lists and
+    dicts in compact mode, or new ones built from people and movies.
+    """
+    if graph is not None:
+        return (graph.person_ids, graph.movie_ids,
+                graph.person_index, graph.movie_index)
+    person_ids = list(people)
+    movie_ids = list(movies)
+    return (person_ids, movie_ids,
+            dict(zip(person_ids, range(len(person_ids)))),
+            dict(zip(movie_ids, range(len(movie_ids)))))
+
+
+def join_paths(forward, backward, meeting):
+    """
+    Builds the source-to-target path through the person where the
+    forward and backward searches met.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, child_id = backward[person_id]
+        path.append((movie_id, child_id))
+        person_id = child_id
+    return path
+
+
+def person_id_for_name(name, policy="ask", fuzzy=False):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    A trailing "(year)", as in "Tom Hanks (1956)", only matches people
+    born that year. policy picks between several matching people (see
+    choose_person). With fuzzy=True a name that matches nobody falls back
+    to the closest names in the index.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = candidates_for_name(name, fuzzy)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
-        print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
-            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
-        try:
-            person_id = input("Intended Person ID: ")
-            if person_id in person_ids:
-                return person_id
-        except ValueError:
-            pass
-        return None
+        return choose_person(name, person_ids, policy)
     else:
         return person_ids[0]
 
 
+def candidates_for_name(name, fuzzy=False):
+    """
+    Returns the sorted person_ids a name could refer to.
+    """
+    birth = None
+    match = re.fullmatch(r"(.*?)\s*\((\d{4})\)", name.strip())
+    if match and match.group(1).lower() in names:
+        name, birth = match.groups()
+
+    person_ids = names.get(name.lower(), set())
+    if not person_ids and fuzzy:
+        matches = get_name_index().fuzzy(name, FUZZY_DISTANCE)
+        if matches:
+            closest = matches[0][0]
+            person_ids = set().union(*[
+                names[key] for distance, key in matches if distance == closest
+            ])
+    if birth is not None:
+        person_ids = {
+            person_id for person_id in person_ids
+            if people[person_id]["birth"] == birth
+        }
+    return sorted(person_ids)
+
+
+def choose_person(name, person_ids, policy="ask"):
+    """
+    Picks one of several people sharing a name.
+
+    "ask" prompts the user, "most-movies" takes whoever starred in the
+    most movies, "oldest" and "youngest" go by birth year, and "none"
+    gives up. Returns None if the policy cannot decide.
+    """
+    if policy == "most-movies":
+        return max(person_ids,
+                   key=lambda person_id: len(movies_for_person(person_id)))
+    elif policy in ["oldest", "youngest"]:
+        born = [person_id for person_id in person_ids
+                if people[person_id]["birth"].isdigit()]
+        if not born:
+            return None
+        born.sort(key=lambda person_id: int(people[person_id]["birth"]))
+        return born[0] if policy == "oldest" else born[-1]
+    elif policy != "ask":
+        return None
+
+    print(f"Which '{name}'?")
+    for person_id in person_ids:
+        person = people[person_id]
+        name = person["name"]
+        birth = person["birth"]
+        print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+    try:
+        person_id = input("Intended Person ID: ")
+        if person_id in person_ids:
+            return person_id
+    except ValueError:
+        pass
+    return None
+
+
+def search_names(query, limit=10):
+    """
+    Returns up to limit person_ids whose names match query, best first:
+    exact matches, then names starting with query, then names within
+    FUZZY_DISTANCE edits. Ties go to whoever starred in more movies.
+    """
+    index = get_name_index()
+    ranks = {}
+    for key in index.prefix(query):
+        rank = 0 if key == query.lower() else 1
+        for person_id in names[key]:
+            ranks[person_id] = rank
+    for distance, key in index.fuzzy(query, FUZZY_DISTANCE):
+        for person_id in names[key]:
+            ranks.setdefault(person_id, 1 + distance)
+    ranked = sorted(ranks, key=lambda person_id: (
+        ranks[person_id], -len(movies_for_person(person_id)), person_id
+    ))
+    return ranked[:limit]
+
+
+def get_name_index():
+    """
+    Returns the NameIndex over names, building it if needed.
+    """
+    global name_index
+    if name_index is None:
+        name_index = NameIndex(names)
+    return name_index
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -145,5 +641,14 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def movies_for_person(person_id):
+    """
+    Returns the set of movie_ids a person starred in.
+    """
+    if graph is not None:
+        return graph.movies_for_person(person_id)
+    return people[person_id]["movies"]
+
+
 if __name__ == "__main__":
     main()
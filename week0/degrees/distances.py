@@ -0,0 +1,142 @@
+import marshal
+from array import array
+from collections import deque
+
+VERSION = 3
+
+
+class DistanceIndex():
+    """
+    Complete breadth-first tree from one source person.
+
+    distances[p] is the degrees of separation of person index p from the
+    source (-1 if not connected), and parents[p] / parent_movies[p] are
+    the person and movie one step back towards the source. key, if set,
+    identifies the data the tree was built from.
+
+    The ID lists and person_index number the loaded people and movies and
+    are shared with the rest of the data (a CoStarGraph's, in compact
+    mode) rather than copied into every index.
+    """
+
+    def __init__(self, source, person_ids, movie_ids, person_index,
+                 distances, parents, parent_movies, key=None):
+        self.source = source
+        self.key = key
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_index = person_index
+        self.distances = distances
+        self.parents = parents
+        self.parent_movies = parent_movies
+
+    @classmethod
+    def build(cls, source, person_ids, movie_ids, person_index, neighbors):
+        """
+        Runs one full breadth-first search from the source person_id.
+        neighbors(person_index) yields (movie_index, person_index) pairs.
+        """
+        index = cls(source, person_ids, movie_ids, person_index,
+                    array("i", [-1]) * len(person_ids),
+                    array("i", [-1]) * len(person_ids),
+                    array("i", [-1]) * len(person_ids))
+        distances = index.distances
+        parents = index.parents
+        parent_movies = index.parent_movies
+
+        root = index.person_index[source]
+        distances[root] = 0
+        frontier = deque([root])
+        while frontier:
+            person = frontier.popleft()
+            distance = distances[person] + 1
+            for movie, neighbor in neighbors(person):
+                if distances[neighbor] < 0:
+                    distances[neighbor] = distance
+                    parents[neighbor] = person
+                    parent_movies[neighbor] = movie
+                    frontier.append(neighbor)
+        return index
+
+    def distance(self, target):
+        """
+        Returns the degrees of separation of target from the source,
+        or None if they are not connected.
+        """
+        person = self.person_index[target]
+        if person >= len(self.distances):
+            # added after the tree was built
+            return None
+        distance = self.distances[person]
+        return None if distance < 0 else distance
+
+    def path_to(self, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs from the
+        source to target, or None if they are not connected.
+        """
+        person = self.person_index.get(target)
+        if person is None or person >= len(self.distances):
+            return None
+        if self.distances[person] < 0:
+            return None
+        path = []
+        while self.parents[person] >= 0:
+            path.append((self.movie_ids[self.parent_movies[person]],
+                         self.person_ids[person]))
+            person = self.parents[person]
+        path.reverse()
+        return path
+
+    def histogram(self):
+        """
+        Returns a dict mapping degrees of separation to the number of
+        people at that distance. Unconnected people are counted under None.
+        """
+        counts = {}
+        for distance in self.distances:
+            key = None if distance < 0 else distance
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def save(self, path):
+        """
+        Writes the index's source, key and arrays to a file. The IDs are
+        left out: the key ties the file to data that numbers them alike.
+        """
+        with open(path, "wb") as f:
+            marshal.dump((
+                VERSION, self.key, self.source,
+                self.distances.tobytes(), self.parents.tobytes(),
+                self.parent_movies.tobytes()
+            ), f)
+
+    @classmethod
+    def load(cls, path, person_ids, movie_ids, person_index):
+        """
+        Reads an index written by save, numbering people and movies like
+        the given ID lists. Check its key before trusting the numbering.
+        """
+        with open(path, "rb") as f:
+            data = marshal.load(f)
+        if data[0] != VERSION:
+            raise ValueError(f"unsupported distance index version: {data[0]}")
+        version, key, source, *arrays = data
+        distances, parents, parent_movies = [
+            array("i", values) for values in arrays
+        ]
+        if len(distances) != len(person_ids):
+            raise ValueError("distance index is for another set of people")
+        return cls(source, person_ids, movie_ids, person_index, distances,
+                   parents, parent_movies, key)
+
+
+def reverse_path(path, start):
+    """
+    Reverses a list of (movie_id, person_id) pairs that leads away from
+    start, so that it leads back to start instead.
+    """
+    if path is None:
+        return None
+    people = [start] + [person_id for movie_id, person_id in path]
+    return [(path[i][0], people[i]) for i in range(len(path) - 1, -1, -1)]
@@ -0,0 +1,192 @@
+from array import array
+
+
+class CoStarGraph():
+    """
+    Person/movie incidence graph over dense integer indices.
+
+    Person and movie IDs are interned to 0..n-1. The movies of person p
+    are person_movies[person_offsets[p]:person_offsets[p + 1]], and the
+    stars of movie m are movie_stars[movie_offsets[m]:movie_offsets[m + 1]]
+    (compressed sparse row layout).
+    """
+
+    def __init__(self, person_ids, movie_ids, person_offsets, person_movies,
+                 movie_offsets, movie_stars, person_index=None,
+                 movie_index=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        # The ID lists and index dicts may be shared with Records, which
+        # then appends new people and movies to both
+        if person_index is None:
+            person_index = dict(zip(person_ids, range(len(person_ids))))
+        if movie_index is None:
+            movie_index = dict(zip(movie_ids, range(len(movie_ids))))
+        self.person_index = person_index
+        self.movie_index = movie_index
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+        # Links added after the CSR arrays were built, by index
+        self.extra_movies = {}
+        self.extra_stars = {}
+
+    @classmethod
+    def from_edges(cls, person_ids, movie_ids, edges, person_index=None,
+                   movie_index=None):
+        """
+        Builds the graph from (person_id, movie_id) pairs.
+        Pairs naming an unknown person or movie are skipped.
+        Given index dicts, the ID lists are kept rather than copied.
+        """
+        if person_index is None:
+            person_ids = list(person_ids)
+        if movie_index is None:
+            movie_ids = list(movie_ids)
+        graph = cls(person_ids, movie_ids, None, None, None, None,
+                    person_index, movie_index)
+        person_index = graph.person_index
+        movie_index = graph.movie_index
+        edge_people = array("i")
+        edge_movies = array("i")
+        for person_id, movie_id in edges:
+            person = person_index.get(person_id)
+            movie = movie_index.get(movie_id)
+            if person is None or movie is None:
+                continue
+            edge_people.append(person)
+            edge_movies.append(movie)
+        graph.person_offsets, graph.person_movies = compress(
+            len(graph.person_ids), edge_people, edge_movies
+        )
+        graph.movie_offsets, graph.movie_stars = compress(
+            len(graph.movie_ids), edge_movies, edge_people
+        )
+        return graph
+
+    def add_star(self, person_id, movie_id):
+        """
+        Links an existing person and movie without rebuilding the arrays.
+        """
+        person = self.person_index[person_id]
+        movie = self.movie_index[movie_id]
+        self.extra_movies.setdefault(person, []).append(movie)
+        self.extra_stars.setdefault(movie, []).append(person)
+
+    def compact(self):
+        """
+        Folds links added since the arrays were built into new arrays.
+        """
+        edge_people = array("i")
+        edge_movies = array("i")
+        for person in range(len(self.person_ids)):
+            for movie in self.movies_of(person):
+                edge_people.append(person)
+                edge_movies.append(movie)
+        self.extra_movies = {}
+        self.extra_stars = {}
+        self.person_offsets, self.person_movies = compress(
+            len(self.person_ids), edge_people, edge_movies
+        )
+        self.movie_offsets, self.movie_stars = compress(
+            len(self.movie_ids), edge_movies, edge_people
+        )
+
+    def movies_of(self, person):
+        """Returns the movie indices of a person index."""
+        offsets = self.person_offsets
+        if person + 1 < len(offsets):
+            movies = self.person_movies[offsets[person]:offsets[person + 1]]
+        else:
+            movies = ()
+        extra = self.extra_movies.get(person)
+        return movies if extra is None else list(movies) + extra
+
+    def stars_of(self, movie):
+        """Returns the person indices of a movie index."""
+        offsets = self.movie_offsets
+        if movie + 1 < len(offsets):
+            stars = self.movie_stars[offsets[movie]:offsets[movie + 1]]
+        else:
+            stars = ()
+        extra = self.extra_stars.get(movie)
+        return stars if extra is None else list(stars) + extra
+
+    def neighbors(self, person):
+        """
+        Yields (movie_index, person_index) pairs for everyone
+        who starred with a given person index.
+        """
+        if self.extra_movies or person + 1 >= len(self.person_offsets):
+            for movie in self.movies_of(person):
+                for star in self.stars_of(movie):
+                    yield movie, star
+            return
+
+        person_offsets = self.person_offsets
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        for movie in self.person_movies[
+            person_offsets[person]:person_offsets[person + 1]
+        ]:
+            for i in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_stars[i]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        person = self.person_index[person_id]
+        movie_ids = self.movie_ids
+        person_ids = self.person_ids
+        return {
+            (movie_ids[movie], person_ids[star])
+            for movie, star in self.neighbors(person)
+        }
+
+    def movies_for_person(self, person_id):
+        """Returns the movie_ids a person starred in."""
+        movie_ids = self.movie_ids
+        return {
+            movie_ids[movie]
+            for movie in self.movies_of(self.person_index[person_id])
+        }
+
+    def stars_for_movie(self, movie_id):
+        """Returns the person_ids who starred in a movie."""
+        person_ids = self.person_ids
+        return {
+            person_ids[star]
+            for star in self.stars_of(self.movie_index[movie_id])
+        }
+
+    def to_ids(self, path):
+        """
+        Converts a path of (movie_index, person_index) pairs
+        into (movie_id, person_id) pairs.
+        """
+        if path is None:
+            return None
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in path]
+
+
+def compress(rows, sources, targets):
+    """
+    Groups targets by source row with a counting sort, returning
+    the CSR (offsets, values) arrays.
+    """
+    offsets = array("q", bytes(8 * (rows + 1)))
+    for source in sources:
+        offsets[source + 1] += 1
+    for row in range(rows):
+        offsets[row + 1] += offsets[row]
+
+    values = array("i", bytes(4 * len(targets)))
+    position = array("q", offsets)
+    for source, target in zip(sources, targets):
+        values[position[source]] = target
+        position[source] += 1
+    return offsets, values
@@ -0,0 +1,77 @@
+from bisect import bisect_left
+
+# Sorts after any character that appears in a name
+LAST_CHARACTER = "\U0010ffff"
+
+
+class NameIndex():
+    """
+    Sorted array of lowercase names supporting prefix
+    and edit-distance lookups.
+    """
+
+    def __init__(self, names):
+        self.keys = sorted(names)
+
+    def prefix(self, prefix, limit=None):
+        """
+        Returns the names starting with prefix, in sorted order.
+        """
+        prefix = prefix.lower()
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + LAST_CHARACTER)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self.keys[start:end]
+
+    def fuzzy(self, query, max_distance=2):
+        """
+        Returns (distance, name) pairs for every name within max_distance
+        edits (Levenshtein distance) of query, closest first.
+
+        Walks the sorted names like a trie: dynamic programming rows are
+        shared between names with a common prefix, and a prefix whose row
+        is already over max_distance skips every name that starts with it.
+        """
+        query = query.lower()
+        keys = self.keys
+        # rows[d] is the edit distance row for the first d characters of key
+        rows = [list(range(len(query) + 1))]
+        current = ""
+        matches = []
+        i = 0
+        while i < len(keys):
+            key = keys[i]
+            common = 0
+            limit = min(len(key), len(current))
+            while common < limit and key[common] == current[common]:
+                common += 1
+            del rows[common + 1:]
+
+            pruned = False
+            for depth in range(common, len(key)):
+                character = key[depth]
+                previous = rows[depth]
+                row = [previous[0] + 1]
+                for j in range(1, len(query) + 1):
+                    row.append(min(
+                        row[j - 1] + 1,
+                        previous[j] + 1,
+                        previous[j - 1] + (query[j - 1] != character)
+                    ))
+                rows.append(row)
+                if min(row) > max_distance:
+                    # No name with this prefix can come within range
+                    i = bisect_left(keys, key[:depth + 1] + LAST_CHARACTER, i)
+                    pruned = True
+                    break
+
+            current = key[:len(rows) - 1]
+            if not pruned:
+                distance = rows[-1][-1]
+                if distance <= max_distance:
+                    matches.append((distance, key))
+                i += 1
+
+        matches.sort()
+        return matches
@@ -0,0 +1,41 @@
+from collections.abc import Mapping
+
+
+class Records(Mapping):
+    """
+    Read-only mapping from IDs to rows stored column by column.
+
+    ids[i] is the ID of row i and columns[field][i] its value for field.
+    index maps IDs back to rows and may be shared with a CoStarGraph.
+    Looking an ID up builds its dict on the fly, so a million rows cost
+    a few lists instead of a million dicts.
+    """
+
+    def __init__(self, ids, index, columns):
+        self.ids = ids
+        self.index = index
+        self.columns = columns
+
+    @classmethod
+    def empty(cls, *fields):
+        return cls([], {}, {field: [] for field in fields})
+
+    def __getitem__(self, key):
+        row = self.index[key]
+        return {field: column[row] for field, column in self.columns.items()}
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, key, **values):
+        """Adds a row for a new ID."""
+        self.index[key] = len(self.ids)
+        self.ids.append(key)
+        for field, column in self.columns.items():
+            column.append(values[field])
@@ -0,0 +1,267 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import batch
+import degrees
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error"}
+
+# The method each endpoint accepts
+ENDPOINTS = {"/path": "GET", "/health": "GET", "/ingest": "POST"}
+
+
+class PathService():
+    """
+    Answers shortest_path queries over HTTP. Requests are parsed on the
+    event loop, searches run in an executor, and recent answers are kept
+    in a least-recently-used cache.
+
+    start_executor, if given, is called with the directories ingested so
+    far to replace the executor after an ingest, so that worker processes
+    holding a copy of the old data are not asked again.
+    """
+
+    def __init__(self, executor, cache_size=1024, policy="none", fuzzy=False,
+                 start_executor=None):
+        self.executor = executor
+        self.start_executor = start_executor
+        self.cache_size = cache_size
+        self.policy = policy
+        self.fuzzy = fuzzy
+        # Maps (source, target) to a path, least recently used first
+        self.cache = OrderedDict()
+        # Searches in progress, so concurrent identical queries share one
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+        # Directories ingested since loading; answers found before the
+        # latest ingest are not cached
+        self.ingested = []
+
+    async def shortest_path(self, source, target):
+        """
+        Returns (path, cached) for two person_ids.
+        """
+        key = (source, target)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return self.cache[key], True
+
+        self.misses += 1
+        generation = len(self.ingested)
+        if key not in self.pending:
+            loop = asyncio.get_running_loop()
+            self.pending[key] = loop.run_in_executor(
+                self.executor, degrees.shortest_path, source, target
+            )
+        try:
+            path = await self.pending[key]
+        finally:
+            self.pending.pop(key, None)
+
+        if generation != len(self.ingested):
+            return path, False
+        self.cache[key] = path
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return path, False
+
+    async def path(self, query):
+        """
+        Handles GET /path?source=NAME&target=NAME.
+        """
+        names = {}
+        for field in ["source", "target"]:
+            if field not in query:
+                return 400, {"error": f"missing parameter: {field}"}
+            names[field] = query[field][0]
+
+        person_ids = {}
+        for field, name in names.items():
+            person_id, error = batch.resolve(name, self.policy, self.fuzzy)
+            if error is not None:
+                return 404, {"error": error}
+            person_ids[field] = person_id
+
+        start = time.perf_counter()
+        path, cached = await self.shortest_path(person_ids["source"],
+                                                person_ids["target"])
+        return 200, {
+            "source": person_ids["source"],
+            "target": person_ids["target"],
+            "degrees": None if path is None else len(path),
+            "path": None if path is None else [{
+                "movie_id": movie_id,
+                "title": degrees.movies[movie_id]["title"],
+                "person_id": person_id,
+                "name": degrees.people[person_id]["name"]
+            } for movie_id, person_id in path],
+            "cached": cached,
+            "seconds": round(time.perf_counter() - start, 6)
+        }
+
+    def ingest(self, query):
+        """
+        Handles POST /ingest?directory=DIR, appending the CSV files in DIR
+        to the loaded data. Searches pause while the files are read.
+        """
+        if "directory" not in query:
+            return 400, {"error": "missing parameter: directory"}
+        directory = query["directory"][0]
+        if not os.path.isdir(directory):
+            return 404, {"error": f"no such directory: {directory}"}
+
+        report = degrees.ingest(directory)
+        self.ingested.append(directory)
+        self.cache.clear()
+        self.pending.clear()
+        if self.start_executor is not None:
+            # Let the old workers finish what they have, then exit
+            self.executor.shutdown(wait=False)
+            self.executor = self.start_executor(self.ingested)
+        return 200, {
+            "report": dict(report),
+            "people": len(degrees.people),
+            "movies": len(degrees.movies)
+        }
+
+    def health(self):
+        """
+        Handles GET /health.
+        """
+        return 200, {
+            "people": len(degrees.people),
+            "movies": len(degrees.movies),
+            "cache": {"size": len(self.cache), "hits": self.hits,
+                      "misses": self.misses}
+        }
+
+    async def handle(self, reader, writer):
+        """
+        Serves one HTTP/1.1 request per connection.
+        """
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                # Headers are not needed; requests carry no body
+                pass
+            try:
+                method, target, version = request.decode("latin-1").split()
+            except ValueError:
+                status, body = 400, {"error": "malformed request line"}
+            else:
+                status, body = await self.route(method, target)
+        except Exception as e:
+            status, body = 500, {"error": str(e)}
+
+        data = json.dumps(body).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def route(self, method, target):
+        """
+        Returns (status, body) for a request.
+        """
+        url = urlsplit(target)
+        if url.path not in ENDPOINTS:
+            return 404, {"error": f"no such endpoint: {url.path}"}
+        if method != ENDPOINTS[url.path]:
+            return 405, {"error": f"only {ENDPOINTS[url.path]} is supported"}
+        if url.path == "/path":
+            return await self.path(parse_qs(url.query))
+        if url.path == "/ingest":
+            return self.ingest(parse_qs(url.query))
+        return self.health()
+
+
+def initialize(directory, compact, cache, ingested):
+    """
+    Loads the data, and whatever was ingested since, in a worker that did
+    not inherit it.
+    """
+    if not degrees.people:
+        batch.initialize(directory, compact, cache)
+        for path in ingested:
+            degrees.ingest(path)
+
+
+async def serve(service, host, port):
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Serving on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve degrees-of-separation queries over HTTP."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="search processes (0 searches in a thread)")
+    parser.add_argument("--cache-size", type=int, default=1024,
+                        help="recent answers to keep")
+    parser.add_argument("--resolve", default="none",
+                        choices=[p for p in degrees.POLICIES if p != "ask"],
+                        help="how to choose between people with one name")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="fall back to the closest names on no match")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--cache", action="store_true")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_data(args.directory, compact=args.compact, cache=args.cache)
+    print("Data loaded.")
+
+    if args.workers > 0:
+        # Forked workers inherit the loaded data; others load it themselves
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            "fork" if "fork" in methods else None
+        )
+
+        def start_executor(ingested):
+            return ProcessPoolExecutor(
+                args.workers, context, initialize,
+                (args.directory, args.compact, args.cache, list(ingested))
+            )
+
+        executor = start_executor([])
+    else:
+        # Searches in a thread see ingested rows as they are added
+        start_executor = None
+        executor = None
+
+    service = PathService(executor, args.cache_size, args.resolve, args.fuzzy,
+                          start_executor)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if service.executor is not None:
+            service.executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
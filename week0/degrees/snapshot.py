@@ -0,0 +1,133 @@
+import json
+import marshal
+import mmap
+import os
+import struct
+
+from graph import CoStarGraph
+from records import Records
+
+MAGIC = b"DEGREES\0"
+VERSION = 2
+FILENAME = "degrees.snapshot"
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Magic, format version, header length
+PREAMBLE = struct.Struct("<8sII")
+
+# Graph arrays stored verbatim, in this order
+ARRAYS = ["person_offsets", "person_movies", "movie_offsets", "movie_stars"]
+
+
+def source_key(directory):
+    """
+    Returns the (mtime, size) of every CSV file the snapshot is built from.
+    """
+    key = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        key[name] = [stat.st_mtime_ns, stat.st_size]
+    return key
+
+
+def save(directory, people, movies, names, graph):
+    """
+    Writes a snapshot of the loaded people and movies Records, the names
+    map and the compact graph indexed like them.
+    Returns False if the directory cannot be written to.
+    """
+    if graph.extra_movies:
+        graph.compact()
+    sections = [
+        ("people", marshal.dumps((
+            people.ids, people.columns["name"], people.columns["birth"]
+        ))),
+        ("movies", marshal.dumps((
+            movies.ids, movies.columns["title"], movies.columns["year"]
+        ))),
+        # Saved whole so loading needs no pass over the people
+        ("names", marshal.dumps(names))
+    ]
+    for name in ARRAYS:
+        sections.append((name, getattr(graph, name).tobytes()))
+
+    # Lay sections out on 8-byte boundaries after the header
+    layout = {}
+    offset = 0
+    for name, data in sections:
+        layout[name] = [offset, len(data)]
+        offset += len(data) + (-len(data) % 8)
+    typecodes = {name: getattr(graph, name).typecode for name in ARRAYS}
+    header = json.dumps({
+        "key": source_key(directory),
+        "sections": layout,
+        "typecodes": typecodes
+    }).encode("utf-8")
+    header += b" " * (-(PREAMBLE.size + len(header)) % 8)
+
+    path = os.path.join(directory, FILENAME)
+    partial = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(partial, "wb") as f:
+            f.write(PREAMBLE.pack(MAGIC, VERSION, len(header)))
+            f.write(header)
+            for name, data in sections:
+                f.write(data)
+                f.write(b"\0" * (-len(data) % 8))
+        os.replace(partial, path)
+    except OSError:
+        if os.path.exists(partial):
+            os.remove(partial)
+        return False
+    return True
+
+
+def load(directory):
+    """
+    Memory-maps a snapshot, returning (people, movies, names, graph) where
+    people and movies are Records sharing the graph's IDs and index, and
+    names maps lowercase names to tuples of person_ids. Returns None if
+    there is no snapshot, or it is from another version or older CSV files.
+    """
+    path = os.path.join(directory, FILENAME)
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, length = PREAMBLE.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            return None
+        header = json.loads(data[PREAMBLE.size:PREAMBLE.size + length])
+        if header["key"] != source_key(directory):
+            return None
+    except (struct.error, ValueError, OSError):
+        return None
+
+    base = PREAMBLE.size + length
+    view = memoryview(data)
+
+    def section(name):
+        offset, size = header["sections"][name]
+        if offset < 0 or size < 0 or base + offset + size > len(data):
+            raise ValueError(f"section {name} runs past the end")
+        return view[base + offset:base + offset + size]
+
+    # A truncated or corrupt file is rebuilt like a stale one
+    try:
+        person_ids, person_names, births = marshal.loads(section("people"))
+        movie_ids, titles, years = marshal.loads(section("movies"))
+        names = marshal.loads(section("names"))
+        arrays = [
+            section(name).cast(header["typecodes"][name]) for name in ARRAYS
+        ]
+    except (EOFError, ValueError, TypeError, KeyError):
+        return None
+    graph = CoStarGraph(person_ids, movie_ids, *arrays)
+    people = Records(person_ids, graph.person_index,
+                     {"name": person_names, "birth": births})
+    movies = Records(movie_ids, graph.movie_index,
+                     {"title": titles, "year": years})
+    return people, movies, names, graph
@@ -1,3 +1,7 @@
+import time
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -5,15 +9,85 @@ class Node():
         self.action = action
 
 
+class SearchStats():
+    """
+    Optional profiling counters for one search. Frontiers given a
+    SearchStats count nodes enqueued and expanded and the peak frontier
+    size; the search adds neighbors generated and per-level wall time.
+    callback, if given, is called with the stats when the search ends.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.nodes_expanded = 0
+        self.nodes_enqueued = 0
+        self.peak_frontier = 0
+        self.neighbors_generated = 0
+        self.level_times = []
+        self.seconds = 0.0
+        self.level_start = None
+
+    def count_neighbors(self, neighbors):
+        """Wraps a neighbors function to count what it generates."""
+        def counted(state):
+            for neighbor in neighbors(state):
+                self.neighbors_generated += 1
+                yield neighbor
+        return counted
+
+    def enqueued(self, count, frontier_size):
+        self.nodes_enqueued += count
+        self.peak_frontier = max(self.peak_frontier, frontier_size)
+
+    def start_level(self):
+        self.level_start = time.perf_counter()
+
+    def end_level(self):
+        now = time.perf_counter()
+        self.level_times.append(now - self.level_start)
+        self.level_start = now
+
+    def finish(self, seconds):
+        self.seconds = seconds
+        if self.callback is not None:
+            self.callback(self)
+
+    def as_dict(self):
+        return {
+            "nodes_expanded": self.nodes_expanded,
+            "nodes_enqueued": self.nodes_enqueued,
+            "peak_frontier": self.peak_frontier,
+            "neighbors_generated": self.neighbors_generated,
+            "level_times": self.level_times,
+            "seconds": self.seconds
+        }
+
+    def __str__(self):
+        lines = [f"Nodes expanded: {self.nodes_expanded}",
+                 f"Nodes enqueued: {self.nodes_enqueued}",
+                 f"Peak frontier: {self.peak_frontier}",
+                 f"Neighbors generated: {self.neighbors_generated}"]
+        for level, seconds in enumerate(self.level_times, 1):
+            lines.append(f"Level {level}: {seconds * 1000:.3f} ms")
+        lines.append(f"Total: {self.seconds * 1000:.3f} ms")
+        return "\n".join(lines)
+
+
 class StackFrontier():
-    def __init__(self):
-        self.frontier = []
+    def __init__(self, stats=None):
+        self.frontier = deque()
+        # Number of copies of each state currently in the frontier
+        self.states = {}
+        self.stats = stats
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+        if self.stats is not None:
+            self.stats.enqueued(1, len(self.frontier))
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,10 +96,19 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard(node.state)
+            if self.stats is not None:
+                self.stats.nodes_expanded += 1
             return node
 
+    def discard(self, state):
+        count = self.states[state] - 1
+        if count:
+            self.states[state] = count
+        else:
+            del self.states[state]
+
 
 class QueueFrontier(StackFrontier):
 
@@ -33,6 +116,8 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard(node.state)
+            if self.stats is not None:
+                self.stats.nodes_expanded += 1
             return node
@@ -0,0 +1,78 @@
+import random
+import sys
+import time
+
+import bitboard
+import gamestate
+import tictactoe as ttt
+
+
+def positions(count, seed=0):
+    """
+    Returns the empty board followed by count random non-terminal boards.
+    """
+    rng = random.Random(seed)
+    boards = [ttt.initial_state()]
+    while len(boards) < count + 1:
+        board = ttt.initial_state()
+        for _ in range(rng.randrange(1, 7)):
+            board = ttt.result(board, rng.choice(ttt.actions(board)))
+            if ttt.terminal(board):
+                break
+        if not ttt.terminal(board):
+            boards.append(board)
+    return boards
+
+
+def value(board):
+    """Returns the game value of board under perfect play."""
+    if ttt.player(board) == ttt.X:
+        return ttt.max_value(board)[0]
+    return ttt.min_value(board)[0]
+
+
+def measure(engine, search, boards, memoize):
+    """
+    Runs search on every board from a cold table, returning the moves,
+    positions searched and seconds taken. engine is the module whose
+    tables and counters the search uses.
+    """
+    engine.memoize = memoize
+    engine.clear_cache()
+    start = time.perf_counter()
+    moves = [search(board) for board in boards]
+    seconds = time.perf_counter() - start
+    engine.memoize = True
+    return moves, engine.search_stats["nodes"], seconds
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark.py [positions]")
+    count = int(sys.argv[1]) if len(sys.argv) == 2 else 20
+    boards = positions(count)
+
+    engines = [
+        ("minimax", ttt, ttt.search, False),
+        ("minimax + table", ttt, ttt.search, True),
+        ("alpha-beta", ttt, ttt.minimax_alphabeta, False),
+        ("alpha-beta + table", ttt, ttt.minimax_alphabeta, True),
+        ("make/unmake", gamestate, gamestate.minimax, False),
+        ("make/unmake + table", gamestate, gamestate.minimax, True),
+        ("bitboard", bitboard, bitboard.minimax, False),
+        ("bitboard + table", bitboard, bitboard.minimax, True)
+    ]
+    print(f"{len(boards)} positions, starting with the empty board")
+    values = [value(board) for board in boards]
+    for name, engine, search, memoize in engines:
+        moves, nodes, seconds = measure(engine, search, boards, memoize)
+        # every engine must keep the game value of each position
+        for board, move, expected in zip(boards, moves, values):
+            if value(ttt.result(board, move)) != expected:
+                sys.exit(f"{name} chose a losing move {move} on {board}")
+        print(f"{name:>20}: {nodes:>9} nodes in {seconds:.3f}s "
+              f"({seconds / nodes * 1e6:.2f} us/node)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Tic Tac Toe on bitboards
+
+A state is a pair of 9-bit integers (x, o) with bit 3 * i + j set
+when that player has marked cell (i, j).
+"""
+
+import tictactoe as ttt
+
+FULL = 0b111111111
+
+# Rows, columns and diagonals as bit masks
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+]
+
+# Indexed by a player's 9 bits
+POPCOUNT = [bin(bits).count("1") for bits in range(FULL + 1)]
+WINNING = [any(bits & mask == mask for mask in WIN_MASKS)
+           for bits in range(FULL + 1)]
+
+# MOVE_IMAGES[s][move] is the bit index move lands on under symmetry s
+# (see tictactoe.SYMMETRIES), and MOVE_PREIMAGES[s] maps it back
+MOVE_IMAGES = [[3 * i + j for i, j in images] for images in ttt.SYMMETRIES]
+MOVE_PREIMAGES = [[3 * i + j for i, j in inverse] for inverse in ttt.INVERSES]
+
+# TRANSFORMS[s][bits] is a player's 9 bits moved under symmetry s
+TRANSFORMS = [
+    [sum(1 << images[move] for move in range(9) if bits >> move & 1)
+     for bits in range(FULL + 1)]
+    for images in MOVE_IMAGES
+]
+
+# Maps canonical x << 9 | o keys to the solved (value, move), with the
+# move in the canonical orientation, shared across games
+table = {}
+search_stats = {"nodes": 0}
+
+# Turn off to search every position afresh (for benchmarking)
+memoize = True
+
+
+def encode(board):
+    """
+    Converts a list-of-lists board to a bitboard state.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == ttt.X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == ttt.O:
+                o |= 1 << (3 * i + j)
+    return (x, o)
+
+
+def decode(state):
+    """
+    Converts a bitboard state to a list-of-lists board.
+    """
+    x, o = state
+    board = ttt.initial_state()
+    for move in range(9):
+        if x >> move & 1:
+            board[move // 3][move % 3] = ttt.X
+        elif o >> move & 1:
+            board[move // 3][move % 3] = ttt.O
+    return board
+
+
+def to_action(move):
+    """Converts a bit index to an (i, j) action."""
+    return (move // 3, move % 3)
+
+
+def from_action(action):
+    """Converts an (i, j) action to a bit index."""
+    return 3 * action[0] + action[1]
+
+
+def player(state):
+    x, o = state
+    difference = POPCOUNT[x] - POPCOUNT[o]
+    if difference == 0:
+        return ttt.X
+    elif difference == 1:
+        return ttt.O
+    return None
+
+
+def actions(state):
+    """
+    Returns the bit indices of the empty cells.
+    """
+    free = FULL & ~(state[0] | state[1])
+    return [move for move in range(9) if free >> move & 1]
+
+
+def result(state, move):
+    x, o = state
+    bit = 1 << move
+    if (x | o) & bit:
+        raise ValueError
+    if POPCOUNT[x] == POPCOUNT[o]:
+        return (x | bit, o)
+    return (x, o | bit)
+
+
+def winner(state):
+    if WINNING[state[0]]:
+        return ttt.X
+    elif WINNING[state[1]]:
+        return ttt.O
+    return None
+
+
+def terminal(state):
+    x, o = state
+    return WINNING[x] or WINNING[o] or x | o == FULL
+
+
+def utility(state):
+    if WINNING[state[0]]:
+        return 1
+    elif WINNING[state[1]]:
+        return -1
+    return 0
+
+
+def canonical(state):
+    """
+    Returns (key, symmetry): the smallest x << 9 | o among the 8
+    rotations and reflections of state, and the symmetry producing it.
+    """
+    x, o = state
+    best = None
+    for symmetry, transform in enumerate(TRANSFORMS):
+        key = transform[x] << 9 | transform[o]
+        if best is None or key < best[0]:
+            best = (key, symmetry)
+    return best
+
+
+def solve(state):
+    """
+    Returns (value, move) for state under perfect play, where value is
+    1 if X wins, -1 if O wins and 0 for a tie.
+
+    Positions are solved once per symmetry class: the search runs on
+    the canonical form and the move is mapped back to state.
+    """
+    if not memoize:
+        return search(state)
+    key, symmetry = canonical(state)
+    if key not in table:
+        table[key] = search((key >> 9, key & FULL))
+    value, move = table[key]
+    if move is None:
+        return (value, None)
+    return (value, MOVE_PREIMAGES[symmetry][move])
+
+
+def search(state):
+    """
+    Solves state by trying every move, with solve() for the children.
+    """
+    search_stats["nodes"] += 1
+    x, o = state
+
+    if WINNING[x]:
+        v = (1, None)
+    elif WINNING[o]:
+        v = (-1, None)
+    elif x | o == FULL:
+        v = (0, None)
+    else:
+        free = FULL & ~(x | o)
+        maximizing = POPCOUNT[x] == POPCOUNT[o]
+        v = None
+        for move in range(9):
+            bit = 1 << move
+            if not free & bit:
+                continue
+            if maximizing:
+                t = solve((x | bit, o))[0]
+                if v is None or t > v[0]:
+                    v = (t, move)
+            else:
+                t = solve((x, o | bit))[0]
+                if v is None or t < v[0]:
+                    v = (t, move)
+
+    return v
+
+
+def clear_cache():
+    table.clear()
+    search_stats["nodes"] = 0
+
+
+def minimax(board):
+    """
+    Drop-in for tictactoe.minimax: takes a list-of-lists board and
+    returns the optimal (i, j) action, searching on bitboards.
+    """
+    move = solve(encode(board))[1]
+    return None if move is None else to_action(move)
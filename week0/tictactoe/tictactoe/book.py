@@ -0,0 +1,55 @@
+import sys
+import time
+
+import tictactoe as ttt
+
+
+def build():
+    """
+    Solves every reachable position, returning a dict mapping canonical
+    codes to (value, canonical action).
+    """
+    book = {}
+    frontier = [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        code, symmetry = ttt.canonical(board)
+        if code in book:
+            continue
+        if ttt.terminal(board):
+            book[code] = (ttt.utility(board), None)
+            continue
+        if ttt.player(board) == ttt.X:
+            value, action = ttt.max_value(board)
+        else:
+            value, action = ttt.min_value(board)
+        book[code] = (value, ttt.to_canonical(action, symmetry))
+        for action in ttt.actions(board):
+            frontier.append(ttt.result(board, action))
+    return book
+
+
+def write(book, path=ttt.BOOK):
+    with open(path, "wb") as f:
+        f.write(ttt.BOOK_HEADER.pack(ttt.BOOK_MAGIC, ttt.BOOK_VERSION,
+                                     len(book)))
+        for code in sorted(book):
+            value, action = book[code]
+            cell = 255 if action is None else 3 * action[0] + action[1]
+            f.write(ttt.BOOK_RECORD.pack(code, value, cell))
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python book.py [path]")
+    path = sys.argv[1] if len(sys.argv) == 2 else ttt.BOOK
+
+    start = time.perf_counter()
+    book = build()
+    write(book, path)
+    print(f"Wrote {len(book)} positions to {path} "
+          f"in {time.perf_counter() - start:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Tic Tac Toe on a mutable board
+
+GameState plays moves in place with push and takes them back with pop,
+keeping the move count, side to move, winner and encoding up to date,
+so the search never copies or rescans a board.
+"""
+
+import math
+
+import tictactoe as ttt
+
+# Cells are numbered 3 * i + j. For each cell, the pairs of other cells
+# completing a row, column or diagonal through it
+LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8),
+         (0, 4, 8), (2, 4, 6)]
+PARTNERS = [[tuple(other for other in line if other != cell)
+             for line in LINES if cell in line] for cell in range(9)]
+ACTIONS = [(cell // 3, cell % 3) for cell in range(9)]
+
+# What a mark in a cell adds to tictactoe.encode(board)
+DIGITS = {ttt.X: 1, ttt.O: 2}
+WEIGHTS = [3 ** (8 - cell) for cell in range(9)]
+
+# Maps tictactoe.encode codes to the solved (value, action)
+table = {}
+search_stats = {"nodes": 0}
+
+# Turn off to search every position afresh (for benchmarking)
+memoize = True
+
+
+class GameState():
+    """
+    A board that changes in place. Assumes the board it starts from
+    was reached by legal play.
+    """
+
+    def __init__(self, board=None):
+        if board is None:
+            board = ttt.initial_state()
+        self.cells = [cell for row in board for cell in row]
+        self.moves = 9 - self.cells.count(ttt.EMPTY)
+        self.won = ttt.winner(board)
+        self.code = ttt.encode(board)
+        # (cell, winner before it) for every push, to undo them
+        self.history = []
+
+    @property
+    def board(self):
+        """The position as a new list-of-lists board."""
+        cells = self.cells
+        return [cells[0:3], cells[3:6], cells[6:9]]
+
+    def player(self):
+        return ttt.X if self.moves % 2 == 0 else ttt.O
+
+    def actions(self):
+        cells = self.cells
+        return [ACTIONS[cell] for cell in range(9) if cells[cell] is ttt.EMPTY]
+
+    def push(self, action):
+        """
+        Plays the side to move at action.
+        """
+        cell = 3 * action[0] + action[1]
+        cells = self.cells
+        if cells[cell] is not ttt.EMPTY:
+            raise ValueError
+        mark = ttt.X if self.moves % 2 == 0 else ttt.O
+        cells[cell] = mark
+        self.history.append((cell, self.won))
+        self.moves += 1
+        self.code += DIGITS[mark] * WEIGHTS[cell]
+        if self.won is None:
+            # only lines through the new mark can have been completed
+            for a, b in PARTNERS[cell]:
+                if cells[a] == mark and cells[b] == mark:
+                    self.won = mark
+                    break
+
+    def pop(self):
+        """
+        Takes back the last move pushed, returning its action.
+        """
+        cell, self.won = self.history.pop()
+        self.moves -= 1
+        self.code -= DIGITS[self.cells[cell]] * WEIGHTS[cell]
+        self.cells[cell] = ttt.EMPTY
+        return ACTIONS[cell]
+
+    def winner(self):
+        return self.won
+
+    def terminal(self):
+        return self.won is not None or self.moves == 9
+
+    def utility(self):
+        if self.won == ttt.X:
+            return 1
+        elif self.won == ttt.O:
+            return -1
+        return 0
+
+
+def max_value(state):
+    """
+    Returns (value, action) for X to move, like tictactoe.max_value,
+    searching state in place.
+    """
+    if memoize and state.code in table:
+        return table[state.code]
+    search_stats["nodes"] += 1
+    if state.terminal():
+        v = (state.utility(), None)
+    else:
+        v = (-math.inf, None)
+        for action in state.actions():
+            state.push(action)
+            t = min_value(state)[0]
+            state.pop()
+            if t > v[0]:
+                v = (t, action)
+    if memoize:
+        table[state.code] = v
+    return v
+
+
+def min_value(state):
+    """
+    Returns (value, action) for O to move, like tictactoe.min_value,
+    searching state in place.
+    """
+    if memoize and state.code in table:
+        return table[state.code]
+    search_stats["nodes"] += 1
+    if state.terminal():
+        v = (state.utility(), None)
+    else:
+        v = (math.inf, None)
+        for action in state.actions():
+            state.push(action)
+            t = max_value(state)[0]
+            state.pop()
+            if t < v[0]:
+                v = (t, action)
+    if memoize:
+        table[state.code] = v
+    return v
+
+
+def clear_cache():
+    table.clear()
+    search_stats["nodes"] = 0
+
+
+def minimax(board):
+    """
+    Drop-in for tictactoe.search: takes a list-of-lists board and
+    returns the optimal (i, j) action, searching with push/pop.
+    """
+    state = GameState(board)
+    if state.terminal():
+        return None
+    if state.player() == ttt.X:
+        return max_value(state)[1]
+    return min_value(state)[1]
@@ -0,0 +1,169 @@
+"""
+Monte Carlo Tree Search (UCT)
+
+Works with any game offering player/actions/result/terminal/utility:
+the tictactoe module itself or an mnk.Game.
+"""
+
+import math
+import random
+import sys
+import time
+
+import tictactoe as ttt
+
+
+class Node():
+    """
+    A position in the search tree. total is the sum of the rewards
+    (1 win, 0.5 tie, 0 loss) seen from it, for the player who moved
+    into it.
+    """
+
+    def __init__(self, board, parent=None, action=None, mover=None):
+        self.board = board
+        self.parent = parent
+        self.action = action
+        self.mover = mover
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.total = 0.0
+
+
+class MCTS():
+    """
+    Drop-in for tictactoe.minimax that picks moves by UCT search.
+
+    Each move runs playouts random games (or as many as fit in seconds,
+    when given). A leaf is expanded once per batch of rollouts, and the
+    tree below the chosen move is kept for the next call.
+    """
+
+    def __init__(self, game=ttt, playouts=10000, seconds=None, batch=8,
+                 exploration=math.sqrt(2), seed=None):
+        self.game = game
+        self.playouts = playouts
+        self.seconds = seconds
+        self.batch = batch
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.root = None
+        self.rollouts = 0
+
+    def __call__(self, board):
+        game = self.game
+        if game.terminal(board):
+            return None
+        root = self.reuse(board)
+        self.root = root
+        self.rollouts = 0
+
+        deadline = (None if self.seconds is None
+                    else time.perf_counter() + self.seconds)
+        while True:
+            # at least one iteration, so the root has a child to choose
+            self.iterate(root)
+            if deadline is None:
+                if self.rollouts >= self.playouts:
+                    break
+            elif time.perf_counter() >= deadline:
+                break
+
+        best = max(root.children, key=lambda child: child.visits)
+        return best.action
+
+    def reuse(self, board):
+        """
+        Returns the node for board from the previous search (after our
+        move and the opponent's reply) if there is one, else a new root.
+        """
+        if self.root is not None:
+            for child in self.root.children:
+                if child.board == board:
+                    child.parent = None
+                    return child
+                for grandchild in child.children:
+                    if grandchild.board == board:
+                        grandchild.parent = None
+                        return grandchild
+        return Node(board)
+
+    def iterate(self, root):
+        """
+        Selects a leaf, expands one child, plays a batch of rollouts
+        from it and backs the rewards up to the root.
+        """
+        game = self.game
+        node = root
+
+        # Selection: descend through fully expanded nodes by UCB1
+        while node.untried == [] and node.children:
+            log_visits = math.log(node.visits)
+            exploration = self.exploration
+            node = max(node.children, key=lambda child: (
+                child.total / child.visits
+                + exploration * math.sqrt(log_visits / child.visits)
+            ))
+
+        # Expansion
+        if node.untried is None:
+            node.untried = ([] if game.terminal(node.board)
+                            else game.actions(node.board))
+            self.rng.shuffle(node.untried)
+        if node.untried:
+            action = node.untried.pop()
+            child = Node(game.result(node.board, action), node, action,
+                         game.player(node.board))
+            node.children.append(child)
+            node = child
+
+        # Simulation
+        batch = self.batch
+        score = sum(self.rollout(node.board) for _ in range(batch))
+        self.rollouts += batch
+
+        # Backpropagation
+        while node is not None:
+            node.visits += batch
+            if node.mover == ttt.X:
+                node.total += (score + batch) / 2
+            elif node.mover == ttt.O:
+                node.total += (batch - score) / 2
+            node = node.parent
+
+    def rollout(self, board):
+        """
+        Plays random moves from board to the end, returning the utility.
+        """
+        game = self.game
+        rng = self.rng
+        while not game.terminal(board):
+            board = game.result(board, rng.choice(game.actions(board)))
+        return game.utility(board)
+
+
+def main():
+    import benchmark
+
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python mcts.py [positions [playouts]]")
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    playouts = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    # Check the moves keep the game value, like benchmark.py does
+    engine = MCTS(playouts=playouts, seed=0)
+    boards = benchmark.positions(count)
+    agree = 0
+    start = time.perf_counter()
+    for board in boards:
+        move = engine(board)
+        agree += (benchmark.value(ttt.result(board, move))
+                  == benchmark.value(board))
+    seconds = time.perf_counter() - start
+    print(f"{agree}/{len(boards)} positions played as well as minimax "
+          f"with {playouts} playouts ({seconds / len(boards):.3f}s per move)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+m,n,k Tic Tac Toe
+
+A rows x cols board where the first player with k marks in a row
+(horizontally, vertically or diagonally) wins. 3,3,3 is Tic Tac Toe
+and 15,15,5 is Gomoku.
+"""
+
+import math
+import sys
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Directions a run can go in; the opposite directions give the same runs
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+# Score of a won game, less the number of moves it took
+WIN = 10 ** 9
+
+# Boards with at most this many cells consider every empty cell as a move
+SMALL_BOARD = 25
+
+
+class Game():
+    """
+    Rules of one m,n,k game. Boards are lists of rows like in tictactoe.
+    """
+
+    def __init__(self, rows=3, cols=3, k=3):
+        if k < 1 or k > max(rows, cols):
+            raise ValueError("k must fit on the board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        # Every line of k cells a player could complete
+        self.windows = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in DIRECTIONS:
+                    end_i = i + di * (k - 1)
+                    end_j = j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        self.windows.append(
+                            [(i + di * step, j + dj * step)
+                             for step in range(k)]
+                        )
+
+    def initial_state(self):
+        return [[EMPTY] * self.cols for _ in range(self.rows)]
+
+    def player(self, board):
+        x_count = sum(row.count(X) for row in board)
+        o_count = sum(row.count(O) for row in board)
+        if x_count == o_count:
+            return X
+        elif x_count - o_count == 1:
+            return O
+        return None
+
+    def actions(self, board):
+        return [(i, j) for i in range(self.rows) for j in range(self.cols)
+                if board[i][j] is EMPTY]
+
+    def result(self, board, action):
+        i, j = action
+        if board[i][j] is not EMPTY:
+            raise ValueError
+        result_board = [row[:] for row in board]
+        result_board[i][j] = self.player(board)
+        return result_board
+
+    def run_length(self, board, action, di, dj):
+        """
+        Returns the length of the run through action in direction (di, dj).
+        """
+        i, j = action
+        mark = board[i][j]
+        length = 1
+        for sign in (1, -1):
+            r, c = i + sign * di, j + sign * dj
+            while (0 <= r < self.rows and 0 <= c < self.cols
+                   and board[r][c] == mark):
+                length += 1
+                r += sign * di
+                c += sign * dj
+        return length
+
+    def wins_at(self, board, action):
+        """
+        Returns whether the mark at action completes k in a row. Only
+        the four lines through action are checked, in O(k).
+        """
+        i, j = action
+        if board[i][j] is EMPTY:
+            return False
+        return any(self.run_length(board, action, di, dj) >= self.k
+                   for di, dj in DIRECTIONS)
+
+    def winner(self, board):
+        """
+        Scans the board once, measuring each run from its first cell.
+        """
+        for i in range(self.rows):
+            for j in range(self.cols):
+                mark = board[i][j]
+                if mark is EMPTY:
+                    continue
+                for di, dj in DIRECTIONS:
+                    r, c = i - di, j - dj
+                    if (0 <= r < self.rows and 0 <= c < self.cols
+                            and board[r][c] == mark):
+                        # not the start of this run
+                        continue
+                    length = 0
+                    r, c = i, j
+                    while (0 <= r < self.rows and 0 <= c < self.cols
+                           and board[r][c] == mark):
+                        length += 1
+                        r += di
+                        c += dj
+                    if length >= self.k:
+                        return mark
+        return None
+
+    def terminal(self, board):
+        return (self.winner(board) is not None
+                or all(cell is not EMPTY for row in board for cell in row))
+
+    def utility(self, board):
+        winner = self.winner(board)
+        if winner == X:
+            return 1
+        elif winner == O:
+            return -1
+        return 0
+
+
+def window_heuristic(game, board):
+    """
+    Scores a position from X's point of view: every line of k cells
+    holding marks of only one player counts 10 ** marks for that player.
+    """
+    score = 0
+    for window in game.windows:
+        x_count = o_count = 0
+        for i, j in window:
+            cell = board[i][j]
+            if cell == X:
+                x_count += 1
+            elif cell == O:
+                o_count += 1
+        if x_count and not o_count:
+            score += 10 ** x_count
+        elif o_count and not x_count:
+            score -= 10 ** o_count
+    return score
+
+
+class Timeout(Exception):
+    pass
+
+
+class Searcher():
+    """
+    Depth-limited alpha-beta (negamax) search with iterative deepening
+    under a time budget. heuristic(game, board) scores positions where
+    the depth runs out, from X's point of view.
+    """
+
+    def __init__(self, game, heuristic=window_heuristic, seconds=1.0,
+                 max_depth=None):
+        self.game = game
+        self.heuristic = heuristic
+        self.seconds = seconds
+        self.max_depth = max_depth
+        self.nodes = 0
+        self.depth = 0
+
+    def best_action(self, board):
+        """
+        Returns the best action found within the time budget, or None if
+        the game is over. Deeper searches replace shallower ones only
+        when they finish in time.
+        """
+        game = self.game
+        if game.terminal(board):
+            return None
+        work = [row[:] for row in board]
+        empty = sum(row.count(EMPTY) for row in work)
+        mark = game.player(work)
+        self.deadline = time.perf_counter() + self.seconds
+        self.nodes = 0
+        self.depth = 0
+
+        moves = self.candidates(work)
+        best = moves[0]
+        max_depth = empty if self.max_depth is None else min(self.max_depth,
+                                                              empty)
+        for depth in range(1, max_depth + 1):
+            try:
+                value, action = self.root(work, depth, mark, empty, best)
+            except Timeout:
+                break
+            best = action
+            self.depth = depth
+            # a forced win or loss will not change with more depth
+            if abs(value) > WIN - game.rows * game.cols:
+                break
+        return best
+
+    def root(self, board, depth, mark, empty, first):
+        moves = self.candidates(board)
+        moves.remove(first)
+        moves.insert(0, first)
+        alpha, beta = -math.inf, math.inf
+        best = (-math.inf, first)
+        for action in moves:
+            value = -self.negamax(board, action, mark, depth - 1,
+                                  -beta, -alpha, empty - 1, 1)
+            if value > best[0]:
+                best = (value, action)
+            alpha = max(alpha, value)
+        return best
+
+    def negamax(self, board, action, mark, depth, alpha, beta, empty, ply):
+        """
+        Plays mark at action, returns the value of the position for the
+        side to move next, and takes the mark back.
+        """
+        self.nodes += 1
+        if self.nodes % 64 == 0 and time.perf_counter() > self.deadline:
+            raise Timeout
+
+        game = self.game
+        i, j = action
+        board[i][j] = mark
+        try:
+            if game.wins_at(board, action):
+                return -(WIN - ply)
+            if empty == 0:
+                return 0
+            opponent = O if mark == X else X
+            if depth == 0:
+                score = self.heuristic(game, board)
+                return score if opponent == X else -score
+
+            value = -math.inf
+            for move in self.candidates(board):
+                value = max(value, -self.negamax(board, move, opponent,
+                                                 depth - 1, -beta, -alpha,
+                                                 empty - 1, ply + 1))
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    break
+            return value
+        finally:
+            board[i][j] = EMPTY
+
+    def candidates(self, board):
+        """
+        Returns the moves worth searching, nearest the center first. On
+        large boards only cells next to an existing mark are considered.
+        """
+        game = self.game
+        if game.rows * game.cols <= SMALL_BOARD:
+            moves = game.actions(board)
+        else:
+            near = set()
+            for i in range(game.rows):
+                for j in range(game.cols):
+                    if board[i][j] is EMPTY:
+                        continue
+                    for r in range(max(i - 1, 0), min(i + 2, game.rows)):
+                        for c in range(max(j - 1, 0), min(j + 2, game.cols)):
+                            if board[r][c] is EMPTY:
+                                near.add((r, c))
+            moves = list(near) or [(game.rows // 2, game.cols // 2)]
+        center_i = (game.rows - 1) / 2
+        center_j = (game.cols - 1) / 2
+        moves.sort(key=lambda move: (abs(move[0] - center_i)
+                                     + abs(move[1] - center_j), move))
+        return moves
+
+
+def main():
+    if len(sys.argv) not in [1, 4, 5]:
+        sys.exit("Usage: python mnk.py [rows cols k [seconds]]")
+    rows, cols, k = [int(arg) for arg in sys.argv[1:4]] or [3, 3, 3]
+    seconds = float(sys.argv[4]) if len(sys.argv) == 5 else 1.0
+
+    # Let the engine play itself and show the game
+    game = Game(rows, cols, k)
+    searcher = Searcher(game, seconds=seconds)
+    board = game.initial_state()
+    while not game.terminal(board):
+        action = searcher.best_action(board)
+        print(f"{game.player(board)} plays {action} "
+              f"(depth {searcher.depth}, {searcher.nodes} nodes)")
+        board = game.result(board, action)
+    for row in board:
+        print(" ".join(cell or "." for cell in row))
+    winner = game.winner(board)
+    print("Tie." if winner is None else f"{winner} wins.")
+
+
+if __name__ == "__main__":
+    main()
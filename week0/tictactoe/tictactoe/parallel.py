@@ -0,0 +1,131 @@
+"""
+Root-split parallel minimax
+
+The positions one or two moves below the root are searched in separate
+processes and their values combined with minimax on the small tree above
+them.
+"""
+
+import argparse
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import benchmark
+import tictactoe as ttt
+
+
+def initialize(memoize):
+    """Sets up a worker process."""
+    ttt.memoize = memoize
+
+
+def value(board):
+    """
+    Returns the game value of a non-terminal board, searched in a worker.
+    """
+    if ttt.player(board) == ttt.X:
+        return ttt.max_value(board)[0]
+    return ttt.min_value(board)[0]
+
+
+class ParallelMinimax():
+    """
+    Drop-in for tictactoe.minimax that splits the search plies moves
+    below the root across a pool of worker processes.
+    """
+
+    def __init__(self, workers=None, plies=1, memoize=True):
+        self.plies = plies
+        self.executor = ProcessPoolExecutor(workers, initializer=initialize,
+                                            initargs=(memoize,))
+
+    def __call__(self, board):
+        if ttt.terminal(board):
+            return None
+        return self.combine(board, self.split(board, self.plies))[1]
+
+    def split(self, board, plies):
+        """
+        Returns the tree of [(action, subtree)] lists below board, whose
+        leaves are game values of terminal boards or futures for the
+        values of the boards plies moves down.
+        """
+        if ttt.terminal(board):
+            return ttt.utility(board)
+        if plies == 0:
+            return self.executor.submit(value, board)
+        return [(action, self.split(ttt.result(board, action), plies - 1))
+                for action in ttt.actions(board)]
+
+    def combine(self, board, tree):
+        """
+        Returns (value, action) for board once the searches below it
+        have finished.
+        """
+        if isinstance(tree, Future):
+            return (tree.result(), None)
+        if not isinstance(tree, list):
+            return (tree, None)
+        maximizing = ttt.player(board) == ttt.X
+        best = None
+        for action, subtree in tree:
+            v = self.combine(ttt.result(board, action), subtree)[0]
+            if best is None or (v > best[0] if maximizing else v < best[0]):
+                best = (v, action)
+        return best
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the speedup of root-split parallel minimax."
+    )
+    parser.add_argument("--workers", type=int, action="append",
+                        help="worker processes to try (default 1, 2, 4, 8)")
+    parser.add_argument("--plies", type=int, default=1, choices=[1, 2],
+                        help="moves below the root to split at")
+    parser.add_argument("--positions", type=int, default=5,
+                        help="random positions to search after the empty "
+                             "board")
+    parser.add_argument("--table", action="store_true",
+                        help="let workers keep a transposition table")
+    args = parser.parse_args()
+
+    boards = benchmark.positions(args.positions)
+    values = [benchmark.value(board) for board in boards]
+
+    # Serial baseline, searched in this process like the workers would
+    ttt.memoize = args.table
+    ttt.clear_cache()
+    start = time.perf_counter()
+    for board in boards:
+        ttt.search(board)
+    serial = time.perf_counter() - start
+    ttt.memoize = True
+    print(f"{len(boards)} positions, split {args.plies} plies below the root")
+    print(f"{'serial':>10}: {serial:.3f}s")
+
+    for workers in args.workers or [1, 2, 4, 8]:
+        with ParallelMinimax(workers, args.plies, args.table) as engine:
+            # start the workers before timing
+            engine.executor.submit(initialize, args.table).result()
+            start = time.perf_counter()
+            moves = [engine(board) for board in boards]
+            seconds = time.perf_counter() - start
+        for board, move, expected in zip(boards, moves, values):
+            if benchmark.value(ttt.result(board, move)) != expected:
+                raise SystemExit(f"chose a losing move {move} on {board}")
+        print(f"{workers:>2} workers: {seconds:.3f}s "
+              f"({serial / seconds:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,48 @@
+import argparse
 import pygame
 import sys
 import time
 
+import bitboard
+import mcts
+import mnk
 import tictactoe as ttt
 
+# Engines the computer can play 3x3 with, chosen on the command line;
+# mnk searches any board within --seconds per move
+ENGINES = {
+    "minimax": ttt.minimax,
+    "alphabeta": ttt.minimax_alphabeta,
+    "bitboard": bitboard.minimax,
+    "mcts": mcts.MCTS()
+}
+parser = argparse.ArgumentParser(description="Play Tic Tac Toe.")
+parser.add_argument("engine", nargs="?", choices=list(ENGINES) + ["mnk"])
+parser.add_argument("--board", type=int, nargs=3, default=[3, 3, 3],
+                    metavar=("ROWS", "COLS", "K"),
+                    help="play k in a row on a rows x cols board")
+parser.add_argument("--seconds", type=float, default=1.0,
+                    help="time the mnk engine may take per move")
+args = parser.parse_args()
+rows, cols, k = args.board
+
+# game supplies the rules: tictactoe itself on 3x3, else an mnk.Game
+if args.board == [3, 3, 3] and args.engine != "mnk":
+    game = ttt
+    engine = ENGINES[args.engine or "minimax"]
+elif args.engine not in [None, "mnk"]:
+    sys.exit(f"{args.engine} only plays 3x3; use mnk for other boards")
+else:
+    try:
+        game = mnk.Game(rows, cols, k)
+    except ValueError as e:
+        sys.exit(str(e))
+    engine = mnk.Searcher(game, seconds=args.seconds).best_action
+
 pygame.init()
-size = width, height = 600, 400
+# 80 pixel tiles as on 3x3, smaller on boards that would not fit
+tile_size = min(80, 540 // max(rows, cols))
+size = width, height = max(600, cols * tile_size + 40), rows * tile_size + 160
 
 # Colors
 black = (0, 0, 0)
@@ -15,10 +52,10 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
 
 user = None
-board = ttt.initial_state()
+board = game.initial_state()
 ai_turn = False
 
 while True:
@@ -33,7 +70,11 @@ while True:
     if user is None:
 
         # Draw title
-        title = largeFont.render("Play Tic-Tac-Toe", True, white)
+        if game is ttt:
+            title = "Play Tic-Tac-Toe"
+        else:
+            title = f"Play {k} in a Row"
+        title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 50)
         screen.blit(title, titleRect)
@@ -67,13 +108,12 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (cols / 2 * tile_size),
+                       height / 2 - (rows / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(rows):
             row = []
-            for j in range(3):
+            for j in range(cols):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -89,12 +129,12 @@ while True:
                 row.append(rect)
             tiles.append(row)
 
-        game_over = ttt.terminal(board)
-        player = ttt.player(board)
+        game_over = game.terminal(board)
+        player = game.player(board)
 
         # Show title
         if game_over:
-            winner = ttt.winner(board)
+            winner = game.winner(board)
             if winner is None:
                 title = f"Game Over: Tie."
             else:
@@ -111,9 +151,8 @@ while True:
         # Check for AI move
         if user != player and not game_over:
             if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
+                move = engine(board)
+                board = game.result(board, move)
                 ai_turn = False
             else:
                 ai_turn = True
@@ -122,10 +161,10 @@ while True:
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(rows):
+                for j in range(cols):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
-                        board = ttt.result(board, (i, j))
+                        board = game.result(board, (i, j))
 
         if game_over:
             againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
@@ -140,7 +179,7 @@ while True:
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
                     user = None
-                    board = ttt.initial_state()
+                    board = game.initial_state()
                     ai_turn = False
 
     pygame.display.flip()
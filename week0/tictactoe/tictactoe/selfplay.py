@@ -0,0 +1,235 @@
+"""
+Headless self-play
+
+Plays many games between two policies without the pygame runner and
+reports outcomes, per-move latency percentiles and positions searched.
+Games are 3x3 Tic Tac Toe unless --board picks another m,n,k game, which
+only the mnk, greedy and random policies can play.
+"""
+
+import argparse
+import functools
+import multiprocessing
+import random
+import time
+
+import bitboard
+import gamestate
+import mcts
+import mnk
+import tictactoe as ttt
+
+# Policies that play any m,n,k game; the rest only know 3x3
+ANY_BOARD = ["mnk", "greedy", "random"]
+
+# The (rows, cols, k) game being played, and its rules: tictactoe itself
+# on 3x3, else an mnk.Game
+size = (3, 3, 3)
+rules = ttt
+
+
+@functools.lru_cache(maxsize=None)
+def mnk_game(size):
+    return mnk.Game(*size)
+
+
+def random_policy(board, rng):
+    return rng.choice(rules.actions(board))
+
+
+def greedy_policy(board, rng):
+    """
+    Wins if it can, else blocks the opponent's win, else plays randomly.
+    """
+    moves = rules.actions(board)
+    me = rules.player(board)
+    opponent = ttt.O if me == ttt.X else ttt.X
+    for mark in [me, opponent]:
+        for action in moves:
+            trial = [row[:] for row in board]
+            trial[action[0]][action[1]] = mark
+            if rules.winner(trial) == mark:
+                return action
+    return rng.choice(moves)
+
+
+# Shared by every game this process plays, keeping its tree between moves
+mcts_engine = mcts.MCTS(playouts=2000)
+mcts_stats = {"rollouts": 0}
+
+
+def mcts_policy(board, rng):
+    action = mcts_engine(board)
+    mcts_stats["rollouts"] += mcts_engine.rollouts
+    return action
+
+
+# Seconds the mnk policy may search each move
+mnk_seconds = 0.1
+mnk_stats = {"nodes": 0}
+
+
+def mnk_policy(board, rng):
+    searcher = mnk.Searcher(mnk_game(size), seconds=mnk_seconds)
+    action = searcher.best_action(board)
+    mnk_stats["nodes"] += searcher.nodes
+    return action
+
+
+# Every policy takes (board, rng) and returns an action
+POLICIES = {
+    "minimax": lambda board, rng: ttt.minimax(board),
+    "search": lambda board, rng: ttt.search(board),
+    "alphabeta": lambda board, rng: ttt.minimax_alphabeta(board),
+    "bitboard": lambda board, rng: bitboard.minimax(board),
+    "gamestate": lambda board, rng: gamestate.minimax(board),
+    "mcts": mcts_policy,
+    "mnk": mnk_policy,
+    "greedy": greedy_policy,
+    "random": random_policy
+}
+
+
+def nodes():
+    """
+    Returns the positions searched, or games played out by MCTS, so far
+    by every engine.
+    """
+    return (ttt.search_stats["nodes"] + bitboard.search_stats["nodes"]
+            + gamestate.search_stats["nodes"] + mcts_stats["rollouts"]
+            + mnk_stats["nodes"])
+
+
+def play(game):
+    """
+    Plays one game of (x policy, o policy, seed, cold, board size,
+    mnk seconds), returning (x policy, o policy, winner, moves) where
+    moves lists (player, seconds, nodes) for every move made. A cold game
+    starts with empty transposition tables.
+    """
+    global size, rules, mnk_seconds
+    x_name, o_name, seed, cold, size, mnk_seconds = game
+    rules = ttt if size == (3, 3, 3) else mnk_game(size)
+    if cold:
+        ttt.clear_cache()
+        bitboard.clear_cache()
+        gamestate.clear_cache()
+    rng = random.Random(seed)
+    # MCTS starts each game afresh, so the seed alone decides its moves
+    mcts_engine.rng.seed(seed)
+    mcts_engine.root = None
+    names = {ttt.X: x_name, ttt.O: o_name}
+    board = rules.initial_state()
+    moves = []
+    while not rules.terminal(board):
+        mark = rules.player(board)
+        before = nodes()
+        start = time.perf_counter()
+        action = POLICIES[names[mark]](board, rng)
+        seconds = time.perf_counter() - start
+        moves.append((mark, seconds, nodes() - before))
+        board = rules.result(board, action)
+    return x_name, o_name, rules.winner(board), moves
+
+
+def percentile(values, p):
+    """Returns the nearest-rank pth percentile of sorted values."""
+    if not values:
+        return 0
+    rank = max(1, round(p / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+def report(results, seconds):
+    """
+    Prints outcome counts and move statistics for each policy on each
+    side, so a policy playing itself is counted once per game per side.
+    """
+    outcomes = {}
+    latencies = {}
+    searched = {}
+    for x_name, o_name, winner, moves in results:
+        names = {ttt.X: x_name, ttt.O: o_name}
+        for mark, name in names.items():
+            counts = outcomes.setdefault((name, mark), {"wins": 0,
+                                                        "losses": 0,
+                                                        "ties": 0})
+            if winner is None:
+                counts["ties"] += 1
+            elif winner == mark:
+                counts["wins"] += 1
+            else:
+                counts["losses"] += 1
+        for mark, move_seconds, move_nodes in moves:
+            key = (names[mark], mark)
+            latencies.setdefault(key, []).append(move_seconds)
+            searched.setdefault(key, []).append(move_nodes)
+
+    move_count = sum(len(moves) for moves in latencies.values())
+    print(f"{len(results)} games, {move_count} moves in {seconds:.2f}s")
+    for key in sorted(outcomes):
+        counts = outcomes[key]
+        times = sorted(latencies.get(key, []))
+        positions = searched.get(key, [])
+        label = f"{key[0]} as {key[1]}"
+        print(f"{label:>15}: {counts['wins']} wins, "
+              f"{counts['losses']} losses, {counts['ties']} ties")
+        if times:
+            p50, p90, p99 = [percentile(times, p) * 1e6 for p in [50, 90, 99]]
+            print(f"{'':>15}  latency p50 {p50:.0f}us, p90 {p90:.0f}us, "
+                  f"p99 {p99:.0f}us, max {times[-1] * 1e6:.0f}us")
+            print(f"{'':>15}  {sum(positions)} nodes, "
+                  f"{sum(positions) / len(positions):.1f} per move")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play tictactoe policies against each other."
+    )
+    parser.add_argument("x", nargs="?", default="search", choices=POLICIES)
+    parser.add_argument("o", nargs="?", default="random", choices=POLICIES)
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--swap", action="store_true",
+                        help="alternate which policy plays X")
+    parser.add_argument("--cold", action="store_true",
+                        help="clear transposition tables before every game")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="worker processes to spread games across")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--board", type=int, nargs=3, default=[3, 3, 3],
+                        metavar=("ROWS", "COLS", "K"),
+                        help="play m,n,k tic tac toe instead of 3x3")
+    parser.add_argument("--seconds", type=float, default=0.1,
+                        help="time the mnk policy may take per move")
+    args = parser.parse_args()
+    board_size = tuple(args.board)
+    try:
+        mnk_game(board_size)
+    except ValueError as e:
+        parser.error(str(e))
+    if board_size != (3, 3, 3):
+        for name in [args.x, args.o]:
+            if name not in ANY_BOARD:
+                parser.error(f"{name} only plays 3x3; "
+                             f"use one of {', '.join(ANY_BOARD)}")
+
+    games = []
+    for i in range(args.games):
+        x_name, o_name = args.x, args.o
+        if args.swap and i % 2:
+            x_name, o_name = o_name, x_name
+        games.append((x_name, o_name, args.seed + i, args.cold,
+                      board_size, args.seconds))
+
+    start = time.perf_counter()
+    if args.jobs > 1:
+        with multiprocessing.Pool(args.jobs) as pool:
+            results = pool.map(play, games, chunksize=max(
+                1, len(games) // (4 * args.jobs)))
+    else:
+        results = [play(game) for game in games]
+    report(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
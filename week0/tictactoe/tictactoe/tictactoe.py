@@ -3,11 +3,74 @@ Tic Tac Toe Player
 """
 
 import math
+import os
+import struct
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Maps canonical board codes to their solved (value, action), with the
+# action in the canonical orientation, shared across games
+transpositions = {}
+cache_stats = {"hits": 0, "misses": 0}
+
+# Turn off to search every position afresh (for benchmarking)
+memoize = True
+
+# Positions searched (not answered from a table) since the last reset
+search_stats = {"nodes": 0}
+
+# Perfect-play table written by book.py: a header, then one record of
+# (canonical code, value, canonical action as 3 * i + j or 255) per position
+BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+BOOK_HEADER = struct.Struct("<8sHI")
+BOOK_RECORD = struct.Struct("<HbB")
+BOOK_MAGIC = b"TTTBOOK\0"
+BOOK_VERSION = 1
+
+# Maps canonical codes to (value, canonical action); loaded on first use
+opening_book = None
+
+# Alpha-beta tries the center, then corners, then edges
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# Maps canonical board codes to (value, action, bound) found by alpha-beta,
+# where bound says whether value is exact or only a lower or upper bound
+bounds = {}
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+def rotate_reflect(i, j, symmetry):
+    """
+    Maps cell (i, j) under one of the 8 symmetries of the board:
+    symmetry % 4 quarter turns clockwise, then a mirror if symmetry >= 4.
+    """
+    for _ in range(symmetry % 4):
+        i, j = j, 2 - i
+    if symmetry >= 4:
+        j = 2 - j
+    return (i, j)
+
+
+# SYMMETRIES[s][3 * i + j] is where cell (i, j) lands under symmetry s
+SYMMETRIES = [[rotate_reflect(i, j, s) for i in range(3) for j in range(3)]
+              for s in range(8)]
+
+
+def invert(images):
+    inverse = [None] * 9
+    for cell, (i, j) in enumerate(images):
+        inverse[3 * i + j] = (cell // 3, cell % 3)
+    return inverse
+
+
+# INVERSES[s] maps the cells of symmetry s back
+INVERSES = [invert(images) for images in SYMMETRIES]
+
 
 def initial_state():
     """
@@ -97,10 +160,86 @@ def utility(board):
     return 0
 
 
+def encode(board):
+    """
+    Returns a unique integer for a board, reading its cells
+    as base-3 digits (0 empty, 1 X, 2 O).
+    """
+    code = 0
+    for row in board:
+        for cell in row:
+            code = code * 3 + (0 if cell is EMPTY else 1 if cell == X else 2)
+    return code
+
+
+def canonical(board):
+    """
+    Returns (code, symmetry): the smallest encoding among the 8 rotations
+    and reflections of board, and the symmetry that produces it. Boards
+    that are symmetric to each other share the same code.
+    """
+    digits = [0 if cell is EMPTY else 1 if cell == X else 2
+              for row in board for cell in row]
+    best = None
+    for symmetry, images in enumerate(SYMMETRIES):
+        cells = [0] * 9
+        for cell, (i, j) in enumerate(images):
+            cells[3 * i + j] = digits[cell]
+        code = 0
+        for digit in cells:
+            code = code * 3 + digit
+        if best is None or code < best[0]:
+            best = (code, symmetry)
+    return best
+
+
+def to_canonical(action, symmetry):
+    """Maps an action to the same cell of the canonical board."""
+    if action is None:
+        return None
+    return SYMMETRIES[symmetry][3 * action[0] + action[1]]
+
+
+def from_canonical(action, symmetry):
+    """Maps an action on the canonical board back to the real board."""
+    if action is None:
+        return None
+    return INVERSES[symmetry][3 * action[0] + action[1]]
+
+
+def cache_info():
+    """
+    Returns the transposition table's hits, misses and size.
+    """
+    return dict(cache_stats, size=len(transpositions))
+
+
+def clear_cache():
+    transpositions.clear()
+    bounds.clear()
+    cache_stats["hits"] = 0
+    cache_stats["misses"] = 0
+    search_stats["nodes"] = 0
+
+
+def remember(key, symmetry, v):
+    if memoize:
+        transpositions[key] = (v[0], to_canonical(v[1], symmetry))
+    return v
+
+
 def min_value(board):
+    # reuse the result if this position was already solved
+    key, symmetry = canonical(board) if memoize else (None, None)
+    if memoize and key in transpositions:
+        cache_stats["hits"] += 1
+        value, action = transpositions[key]
+        return (value, from_canonical(action, symmetry))
+    cache_stats["misses"] += 1
+    search_stats["nodes"] += 1
     # if game is over, return game value
     if terminal(board):
-        return (utility(board), None)
+        return remember(key, symmetry, (utility(board), None))
     # initial value infinity, any game should be smaller
     v = (math.inf, None)
     # iterate through all possible actions with current board,
@@ -112,13 +251,21 @@ def min_value(board):
             # max value, save max value and action that led to it
             v = (t[0], action)
     # return value, action pair with the smallest max value
-    return v
+    return remember(key, symmetry, v)
 
 
 def max_value(board):
+    # reuse the result if this position was already solved
+    key, symmetry = canonical(board) if memoize else (None, None)
+    if memoize and key in transpositions:
+        cache_stats["hits"] += 1
+        value, action = transpositions[key]
+        return (value, from_canonical(action, symmetry))
+    cache_stats["misses"] += 1
+    search_stats["nodes"] += 1
     # if game is over, return game value
     if terminal(board):
-        return (utility(board), None)
+        return remember(key, symmetry, (utility(board), None))
     # initial value negative infinity, any game should be larger
     v = (-math.inf, None)
     # iterate through all possible actions with current board,
@@ -130,11 +277,130 @@ def max_value(board):
             # min value, save min value and action that led to it
             v = (t[0], action)
     # return value, action pair with largest min value
-    return v
+    return remember(key, symmetry, v)
 
 
 def minimax(board):
+    """
+    Returns the optimal action for the current player on the board,
+    from the opening book when there is one, else by searching.
+    """
+    global opening_book
+    if opening_book is None:
+        opening_book = load_book()
+    code, symmetry = canonical(board)
+    if code in opening_book:
+        return from_canonical(opening_book[code][1], symmetry)
+    return search(board)
+
+
+def search(board):
+    """
+    Returns the optimal action for the current player by searching.
+    """
     if player(board) == X:
         return max_value(board)[1]
     if player(board) == O:
         return min_value(board)[1]
+
+
+def load_book(path=BOOK):
+    """
+    Reads an opening book written by book.py. Returns an empty book if
+    the file is missing or from another version.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return {}
+    try:
+        magic, version, count = BOOK_HEADER.unpack_from(data)
+    except struct.error:
+        return {}
+    end = BOOK_HEADER.size + count * BOOK_RECORD.size
+    if magic != BOOK_MAGIC or version != BOOK_VERSION or len(data) != end:
+        return {}
+
+    book = {}
+    for code, value, cell in BOOK_RECORD.iter_unpack(data[BOOK_HEADER.size:]):
+        book[code] = (value, None if cell == 255 else (cell // 3, cell % 3))
+    return book
+
+
+def ordered_actions(board, first=None):
+    """
+    Returns the available actions, center first, then corners, then
+    edges, with first (e.g. a previously found best move) ahead of all.
+    """
+    moves = [action for action in MOVE_ORDER
+             if board[action[0]][action[1]] is EMPTY]
+    if first in moves:
+        moves.remove(first)
+        moves.insert(0, first)
+    return moves
+
+
+def alphabeta(board, alpha=-math.inf, beta=math.inf):
+    """
+    Returns (value, action) for board like max_value/min_value, but
+    stops searching a position once its value cannot fall inside
+    (alpha, beta), or once a win for the side to move is proven.
+    """
+    search_stats["nodes"] += 1
+    if terminal(board):
+        return (utility(board), None)
+
+    key, symmetry = canonical(board) if memoize else (None, None)
+    first = None
+    if memoize and key in bounds:
+        value, action, bound = bounds[key]
+        action = from_canonical(action, symmetry)
+        if (bound == EXACT or (bound == LOWER and value >= beta)
+                or (bound == UPPER and value <= alpha)):
+            cache_stats["hits"] += 1
+            return (value, action)
+        # not conclusive here, but its best move is likely still best
+        first = action
+    cache_stats["misses"] += 1
+
+    maximizing = player(board) == X
+    original_alpha, original_beta = alpha, beta
+    v = (-math.inf if maximizing else math.inf, None)
+    for action in ordered_actions(board, first):
+        t = alphabeta(result(board, action), alpha, beta)[0]
+        if maximizing:
+            if t > v[0]:
+                v = (t, action)
+            alpha = max(alpha, t)
+            # nothing beats a win for X
+            if t == 1:
+                break
+        else:
+            if t < v[0]:
+                v = (t, action)
+            beta = min(beta, t)
+            # nothing beats a win for O
+            if t == -1:
+                break
+        if alpha >= beta:
+            break
+
+    if memoize:
+        if v[0] <= original_alpha:
+            bound = UPPER
+        elif v[0] >= original_beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        bounds[key] = (v[0], to_canonical(v[1], symmetry), bound)
+    return v
+
+
+def minimax_alphabeta(board):
+    """
+    Returns an optimal action like minimax, searched with alpha-beta.
+    """
+    if terminal(board):
+        return None
+    return alphabeta(board)[1]
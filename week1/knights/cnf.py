@@ -0,0 +1,157 @@
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    Compiles sentences into conjunctive normal form with the Tseitin
+    transformation: every compound subformula gets a variable defined
+    by a few clauses, so the CNF grows linearly with the sentence.
+
+    Variables are numbered from 1 and literals are DIMACS-style integers
+    (v or -v). Symbols are interned to variables by name, and equal
+    subformulas anywhere in the sentences added share one variable.
+    """
+
+    def __init__(self):
+        self.variables = 0
+        self.clauses = []
+        # Maps symbol names to variables
+        self.symbols = {}
+        # Maps normalized gates, like ("and", frozenset of literals),
+        # to the variable defined as their value
+        self.gates = {}
+
+    def variable(self, name):
+        """
+        Returns the variable for the symbol called name.
+        """
+        if name not in self.symbols:
+            self.variables += 1
+            self.symbols[name] = self.variables
+        return self.symbols[name]
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to sentence, adding the clauses that
+        define any new subformulas.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if isinstance(sentence, And):
+            return self.conjunction(
+                [self.literal(conjunct) for conjunct in sentence.conjuncts]
+            )
+        if isinstance(sentence, Or):
+            # a ∨ b is ¬(¬a ∧ ¬b)
+            return -self.conjunction(
+                [-self.literal(disjunct) for disjunct in sentence.disjuncts]
+            )
+        if isinstance(sentence, Implication):
+            return -self.conjunction([self.literal(sentence.antecedent),
+                                      -self.literal(sentence.consequent)])
+        if isinstance(sentence, Biconditional):
+            return self.equivalence(self.literal(sentence.left),
+                                    self.literal(sentence.right))
+        raise TypeError("must be a logical sentence")
+
+    def conjunction(self, literals):
+        """
+        Returns a literal for the conjunction of literals.
+        """
+        operands = frozenset(literals)
+        if len(operands) == 1:
+            return next(iter(operands))
+        key = ("and", operands)
+        if key not in self.gates:
+            gate = self.gate(key)
+            for literal in operands:
+                self.clauses.append([-gate, literal])
+            self.clauses.append([gate] + [-literal for literal in operands])
+        return self.gates[key]
+
+    def equivalence(self, left, right):
+        """
+        Returns a literal for left <=> right.
+        """
+        # ¬a <=> b is ¬(a <=> b), so only gates on variables are needed
+        sign = 1 if (left > 0) == (right > 0) else -1
+        left, right = sorted([abs(left), abs(right)])
+        key = ("iff", left, right)
+        if key not in self.gates:
+            gate = self.gate(key)
+            self.clauses.append([-gate, -left, right])
+            self.clauses.append([-gate, left, -right])
+            self.clauses.append([gate, left, right])
+            self.clauses.append([gate, -left, -right])
+        return sign * self.gates[key]
+
+    def gate(self, key):
+        self.variables += 1
+        self.gates[key] = self.variables
+        return self.variables
+
+    def add(self, sentence):
+        """
+        Adds sentence as something that must hold. Conjunctions and
+        disjunctions at the top level become clauses directly.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append(
+                [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            )
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def write_dimacs(self, f):
+        """
+        Writes the clauses to a file in DIMACS format, naming the symbol
+        variables in comment lines.
+        """
+        for name, variable in self.symbols.items():
+            f.write(f"c symbol {variable} {name}\n")
+        f.write(f"p cnf {self.variables} {len(self.clauses)}\n")
+        for clause in self.clauses:
+            f.write(" ".join(str(literal) for literal in clause) + " 0\n")
+
+    @classmethod
+    def read_dimacs(cls, f):
+        """
+        Returns the CNF in a DIMACS file, with symbol names if they were
+        written by write_dimacs. Subformulas compiled before writing are
+        not recognized again, so sentences added later get new gates.
+        """
+        cnf = cls()
+        clause = []
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0] == "%":
+                continue
+            if fields[0] == "c":
+                if len(fields) > 3 and fields[1] == "symbol":
+                    name = line.split(None, 3)[3].rstrip("\r\n")
+                    cnf.symbols[name] = int(fields[2])
+                continue
+            if fields[0] == "p":
+                if len(fields) != 4 or fields[1] != "cnf":
+                    raise ValueError(f"bad problem line: {line.strip()}")
+                cnf.variables = int(fields[2])
+                continue
+            for field in fields:
+                literal = int(field)
+                if literal == 0:
+                    cnf.clauses.append(clause)
+                    clause = []
+                else:
+                    cnf.variables = max(cnf.variables, abs(literal))
+                    clause.append(literal)
+        if clause:
+            cnf.clauses.append(clause)
+        return cnf
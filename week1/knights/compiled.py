@@ -0,0 +1,163 @@
+import functools
+import itertools
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# Symbols enumerated as bits of one truth table column; any beyond these
+# are enumerated one assignment at a time
+COLUMN_SYMBOLS = 20
+
+SYMBOL = 0
+NOT = 1
+AND = 2
+OR = 3
+IMPLIES = 4
+IFF = 5
+
+
+class Program():
+    """
+    Sentences compiled once into a flat list of instructions, which
+    evaluate every sentence over many models at a time.
+
+    Values are Python integers used as bit vectors: bit m of a value is
+    the sentence's truth in model m, so one bitwise operation evaluates
+    a node in every model at once. Equal subformulas are compiled once.
+    """
+
+    def __init__(self, sentences):
+        # (opcode, operands) in evaluation order; instruction i's value
+        # is register i
+        self.instructions = []
+        self.registers = {}
+        self.outputs = [self.compile(sentence) for sentence in sentences]
+        self.symbols = sorted(set().union(
+            *[sentence.symbols() for sentence in sentences]
+        ))
+
+    def compile(self, sentence):
+        """
+        Returns the register holding sentence's value.
+        """
+        if sentence in self.registers:
+            return self.registers[sentence]
+        if isinstance(sentence, Symbol):
+            instruction = (SYMBOL, sentence.name)
+        elif isinstance(sentence, Not):
+            instruction = (NOT, self.compile(sentence.operand))
+        elif isinstance(sentence, And):
+            instruction = (AND, [self.compile(conjunct)
+                                 for conjunct in sentence.conjuncts])
+        elif isinstance(sentence, Or):
+            instruction = (OR, [self.compile(disjunct)
+                                for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            instruction = (IMPLIES, (self.compile(sentence.antecedent),
+                                     self.compile(sentence.consequent)))
+        elif isinstance(sentence, Biconditional):
+            instruction = (IFF, (self.compile(sentence.left),
+                                 self.compile(sentence.right)))
+        else:
+            raise TypeError("must be a logical sentence")
+        self.instructions.append(instruction)
+        self.registers[sentence] = len(self.instructions) - 1
+        return self.registers[sentence]
+
+    def run(self, inputs, full):
+        """
+        Returns the value of every output sentence, given inputs mapping
+        each symbol name to its bit vector. full has a bit set for every
+        model evaluated.
+        """
+        values = []
+        for opcode, operands in self.instructions:
+            if opcode == SYMBOL:
+                value = inputs[operands]
+            elif opcode == NOT:
+                value = full ^ values[operands]
+            elif opcode == AND:
+                value = full
+                for operand in operands:
+                    value &= values[operand]
+            elif opcode == OR:
+                value = 0
+                for operand in operands:
+                    value |= values[operand]
+            elif opcode == IMPLIES:
+                value = (full ^ values[operands[0]]) | values[operands[1]]
+            else:
+                value = full ^ values[operands[0]] ^ values[operands[1]]
+            values.append(value)
+        return [values[output] for output in self.outputs]
+
+    def evaluate_many(self, models):
+        """
+        Returns, for each model (a dict like Sentence.evaluate takes), a
+        list of the output sentences' truth values.
+        """
+        inputs = {}
+        for symbol in self.symbols:
+            column = 0
+            for m, model in enumerate(models):
+                try:
+                    if model[symbol]:
+                        column |= 1 << m
+                except KeyError:
+                    raise Exception(f"variable {symbol} not in model")
+            inputs[symbol] = column
+        outputs = self.run(inputs, (1 << len(models)) - 1)
+        return [[bool(output >> m & 1) for output in outputs]
+                for m in range(len(models))]
+
+
+@functools.lru_cache(maxsize=None)
+def columns(count):
+    """
+    Returns (columns, full) for the truth table of count symbols: bit m
+    of columns[i] is bit i of m, for m below 2 ** count.
+    """
+    size = 1 << count
+    full = (1 << size) - 1
+    result = []
+    for i in range(count):
+        # 2 ** i zeros then 2 ** i ones, doubled until it fills the table
+        column = ((1 << (1 << i)) - 1) << (1 << i)
+        width = 1 << (i + 1)
+        while width < size:
+            column |= column << width
+            width *= 2
+        result.append(column)
+    return result, full
+
+
+def truth_table(sentence, symbols=None):
+    """
+    Returns the sentence's truth table over symbols (names, defaulting
+    to its own in sorted order) as an integer: bit m is its value in the
+    model giving symbols[i] the value of bit i of m.
+    """
+    symbols = sorted(sentence.symbols()) if symbols is None else symbols
+    if len(symbols) > COLUMN_SYMBOLS:
+        raise ValueError(f"more than {COLUMN_SYMBOLS} symbols")
+    bits, full = columns(len(symbols))
+    return Program([sentence]).run(dict(zip(symbols, bits)), full)[0]
+
+
+def model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, like logic.model_check, by
+    evaluating both over whole truth table columns at a time.
+    """
+    program = Program([knowledge, query])
+    symbols = program.symbols
+    low = symbols[:COLUMN_SYMBOLS]
+    high = symbols[COLUMN_SYMBOLS:]
+    bits, full = columns(len(low))
+    inputs = dict(zip(low, bits))
+    for values in itertools.product([0, full], repeat=len(high)):
+        inputs.update(zip(high, values))
+        knowledge_value, query_value = program.run(inputs, full)
+        # a model of the knowledge where the query is false
+        if knowledge_value & ~query_value:
+            return False
+    return True
@@ -0,0 +1,380 @@
+import heapq
+
+from cnf import CNF
+
+
+class Solver():
+    """
+    Conflict-driven clause learning (CDCL) SAT solver.
+
+    Variables are numbered from 1 and literals are DIMACS-style integers:
+    v for variable v being true, -v for it being false. Clauses are added
+    with add_clause and stay, along with any learned clauses, across calls
+    to solve, which can take assumptions holding only for that call.
+    """
+
+    def __init__(self):
+        self.variables = 0
+        self.clauses = []
+        self.learnts = []
+        # Maps a literal to the clauses watching it, i.e. those that
+        # must be revisited when it becomes false
+        self.watches = {}
+        # Maps each assigned literal (and its negation) to its value
+        self.values = {}
+        # Indexed by variable: decision level, implying clause,
+        # VSIDS activity and last value taken
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.phase = [False]
+        self.increment = 1.0
+        # Heap of (-activity, variable) to pick decisions from; entries
+        # for assigned variables or stale activities are skipped
+        self.order = []
+        self.trail = []
+        # Where each decision level starts on the trail
+        self.levels = []
+        self.head = 0
+        # False once the clauses are unsatisfiable on their own
+        self.ok = True
+        self.model = None
+        self.conflicts = 0
+
+    def new_variable(self):
+        self.variables += 1
+        variable = self.variables
+        self.watches[variable] = []
+        self.watches[-variable] = []
+        self.level.append(0)
+        self.reason.append(None)
+        self.activity.append(0.0)
+        self.phase.append(False)
+        heapq.heappush(self.order, (0.0, variable))
+        return variable
+
+    def add_clause(self, literals):
+        """
+        Adds a clause (an iterable of literals, any of which may hold).
+        Returns False if the clauses became unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        clause = []
+        for literal in literals:
+            if -literal in clause:
+                # tautology, always satisfied
+                return True
+            value = self.values.get(literal)
+            if value is True:
+                return True
+            if value is None and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.clauses.append(clause)
+            self.watch(clause)
+        return self.ok
+
+    def solve(self, assumptions=()):
+        """
+        Returns whether the clauses, plus the assumption literals, can
+        all be satisfied. If so, model maps every variable to a value.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        assumptions = list(assumptions)
+        limit = 100
+        conflicts = 0
+
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.levels:
+                    self.ok = False
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)
+                else:
+                    self.learnts.append(learnt)
+                    self.watch(learnt)
+                    self.assign(learnt[0], learnt)
+                self.increment /= 0.95
+                continue
+
+            if conflicts >= limit:
+                # restart, keeping what was learned
+                conflicts = 0
+                limit = int(limit * 1.5)
+                self.backtrack(0)
+                continue
+
+            level = len(self.levels)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.values.get(literal)
+                if value is False:
+                    self.backtrack(0)
+                    return False
+                self.levels.append(len(self.trail))
+                if value is None:
+                    self.assign(literal, None)
+                continue
+
+            variable = self.pick()
+            if variable is None:
+                self.model = {v: self.values[v]
+                              for v in range(1, self.variables + 1)}
+                self.backtrack(0)
+                return True
+            self.levels.append(len(self.trail))
+            self.assign(variable if self.phase[variable] else -variable, None)
+
+    def watch(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[literal] = True
+        self.values[-literal] = False
+        self.level[variable] = len(self.levels)
+        self.reason[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses. Returns a clause
+        with all literals false if there is a conflict, else None.
+        """
+        values = self.values
+        watches = self.watches
+        trail = self.trail
+        while self.head < len(trail):
+            false_literal = -trail[self.head]
+            self.head += 1
+            watchers = watches[false_literal]
+            kept = 0
+            i = 0
+            count = len(watchers)
+            while i < count:
+                clause = watchers[i]
+                i += 1
+                # keep the literal that became false at clause[1]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+                first = clause[0]
+                if values.get(first) is True:
+                    watchers[kept] = clause
+                    kept += 1
+                    continue
+
+                for k in range(2, len(clause)):
+                    if values.get(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], false_literal
+                        watches[clause[1]].append(clause)
+                        break
+                else:
+                    watchers[kept] = clause
+                    kept += 1
+                    if values.get(first) is False:
+                        # conflict: keep the remaining watchers as they are
+                        while i < count:
+                            watchers[kept] = watchers[i]
+                            kept += 1
+                            i += 1
+                        del watchers[kept:]
+                        self.head = len(trail)
+                        return clause
+                    self.assign(first, clause)
+            del watchers[kept:]
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (learnt clause, level to backjump to) for a conflict,
+        learning the first unique implication point. The learnt clause's
+        first literal is the one it asserts after backjumping.
+        """
+        level = self.level
+        current = len(self.levels)
+        learnt = [None]
+        seen = set()
+        pending = 0
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for literal in clause:
+                variable = abs(literal)
+                if variable in seen or level[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if level[variable] == current:
+                    pending += 1
+                else:
+                    learnt.append(literal)
+            # the most recent assignment involved in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reason[abs(literal)]
+        learnt[0] = -literal
+
+        if len(learnt) == 1:
+            return learnt, 0
+        # watch the literal from the highest remaining level second
+        deepest = max(range(1, len(learnt)),
+                      key=lambda k: level[abs(learnt[k])])
+        learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+        return learnt, level[abs(learnt[1])]
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+            self.order = [(-self.activity[v], v)
+                          for v in range(1, self.variables + 1)]
+            heapq.heapify(self.order)
+        elif variable not in self.values:
+            heapq.heappush(self.order,
+                           (-self.activity[variable], variable))
+
+    def backtrack(self, level):
+        """
+        Undoes every assignment above decision level.
+        """
+        if len(self.levels) <= level:
+            return
+        values = self.values
+        activity = self.activity
+        order = self.order
+        start = self.levels[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phase[variable] = literal > 0
+            self.reason[variable] = None
+            del values[literal]
+            del values[-literal]
+            heapq.heappush(order, (-activity[variable], variable))
+        del self.trail[start:]
+        del self.levels[level:]
+        self.head = min(self.head, start)
+
+    def pick(self):
+        """
+        Returns the unassigned variable with the highest activity, or
+        None if every variable is assigned.
+        """
+        values = self.values
+        activity = self.activity
+        order = self.order
+        while order:
+            negative, variable = heapq.heappop(order)
+            if variable not in values and -negative == activity[variable]:
+                return variable
+        # entries can go stale; fall back to a scan before giving up
+        for variable in range(1, self.variables + 1):
+            if variable not in values:
+                return variable
+        return None
+
+
+def load(solver, cnf, start=0):
+    """
+    Adds cnf's variables, and its clauses from index start on, to solver.
+    Returns the number of clauses loaded so far, to pass as start when
+    more have been added to cnf.
+    """
+    while solver.variables < cnf.variables:
+        solver.new_variable()
+    for clause in cnf.clauses[start:]:
+        solver.add_clause(clause)
+    return len(cnf.clauses)
+
+
+class KnowledgeBase():
+    """
+    Sentences told one at a time, compiled into a solver that is kept
+    between questions, along with the clauses it learns.
+    """
+
+    def __init__(self, *sentences):
+        self.cnf = CNF()
+        self.solver = Solver()
+        self.loaded = 0
+        for sentence in sentences:
+            self.tell(sentence)
+
+    def tell(self, sentence):
+        """
+        Adds sentence to what is known.
+        """
+        self.cnf.add(sentence)
+        self.loaded = load(self.solver, self.cnf, self.loaded)
+
+    def literal(self, query):
+        literal = self.cnf.literal(query)
+        self.loaded = load(self.solver, self.cnf, self.loaded)
+        return literal
+
+    def ask(self, query):
+        """
+        Returns whether what is known entails query.
+        """
+        return not self.solver.solve([-self.literal(query)])
+
+    def ask_many(self, queries):
+        """
+        Returns, for each query, whether what is known entails it.
+
+        A query false in any model of the knowledge is not entailed, so
+        one model rules out many queries and only the rest need a solve
+        of their own; each of those that fails yields another model.
+        """
+        literals = [self.literal(query) for query in queries]
+        solver = self.solver
+        if not solver.solve():
+            # nothing is consistent with the knowledge
+            return [True] * len(literals)
+        models = [solver.model]
+        answers = []
+        for literal in literals:
+            if any(model[abs(literal)] != (literal > 0) for model in models):
+                answers.append(False)
+            elif solver.solve([-literal]):
+                models.append(solver.model)
+                answers.append(False)
+            else:
+                answers.append(True)
+        return answers
+
+
+def model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, like logic.model_check, by
+    showing knowledge ∧ ¬query is unsatisfiable.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    query = cnf.literal(query)
+    solver = Solver()
+    load(solver, cnf)
+    return not solver.solve([-query])